@@ -1,15 +1,26 @@
+import importlib
 import streamlit as st
 from modules.homepage import display_homepage
-from modules.team_based import display_team_based
-from modules.team_comparison import display_team_comparison
-from modules.player_based import display_player_based
-from modules.match_comparison import display_match_comparison
-from modules.analysis import display_eda_analysis, display_predictive_analytics
 from config import team_list_by_season, change_situations, change_body_parts
-from code.utils.helpers import load_styles
 from st_social_media_links import SocialMediaIcons
 from streamlit_option_menu import option_menu
 
+def enable_copy_on_write():
+    # Sessions share the cached season tables through shallow copies; copy-on-write keeps an
+    # in-place edit in one session from writing through to the frames the others are reading.
+    import pandas as pd
+    pd.set_option("mode.copy_on_write", True)
+
+# Section pages import pandas and the data helpers, so they load when a section is first opened
+# and the home page renders without them.
+def load_page(module_name, function_name):
+    enable_copy_on_write()
+    return getattr(importlib.import_module(f"modules.{module_name}"), function_name)
+
+def load_styles():
+    with open("assets/style.css") as f:
+        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+
 def configure_app():
     st.set_page_config(
         page_title="Data FC",
@@ -76,7 +87,7 @@ def handle_team_section():
         label_visibility="hidden"
     )
     if selection == "Takım Bazlı":
-        display_team_based(
+        load_page("team_based", "display_team_based")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -84,7 +95,7 @@ def handle_team_section():
             st.session_state.get("selected_season")
         )
     elif selection == "Takımlar Arası":
-        display_team_comparison(
+        load_page("team_comparison", "display_team_comparison")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -100,7 +111,7 @@ def handle_player_section():
         label_visibility="hidden"
     )
     if selection == "Oyuncu Bazlı":
-        display_player_based(
+        load_page("player_based", "display_player_based")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -120,7 +131,7 @@ def handle_match_section():
     if selection == "Takım Bazlı":
         st.info("Takım bazlı bölümü yakında eklenecek.")
     elif selection == "Takımlar Arası":
-        display_match_comparison(
+        load_page("match_comparison", "display_match_comparison")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -136,7 +147,7 @@ def handle_analysis_section():
         label_visibility="hidden"
     )
     if selection == "Keşifçi Veri Analizi":
-        display_eda_analysis(
+        load_page("analysis", "display_eda_analysis")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -144,7 +155,7 @@ def handle_analysis_section():
             st.session_state.get("selected_season")
         )
     elif selection == "Tahmin":
-        display_predictive_analytics(
+        load_page("analysis", "display_predictive_analytics")(
             team_list_by_season,
             change_situations,
             change_body_parts,
@@ -3,7 +3,9 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, add_footer, load_filtered_json_files, turkish_english_lower
+from code.utils.helpers import add_download_button, add_footer, load_many, load_match_dimension, read_season_artifact, turkish_english_lower
+from code.utils.coordinate_store import get_player_game_means
+from code.utils.derived_tables import attach_match_teams
 import matplotlib.pyplot as plt
 
 plt.style.use(PLOT_STYLE)
@@ -33,7 +35,7 @@ def create_geometry_plot(overall_data, category, league, season, league_display,
         metric = "vertical_spread"
         xlabel = "Dikey Yayılım (Standart Sapma)"
 
-    team_means = overall_data.groupby("team_name")[metric].mean().sort_values(ascending=False)
+    team_means = overall_data.groupby("team_name", observed=True)[metric].mean().sort_values(ascending=False)
     sorted_teams = team_means.index.tolist()
 
     fig, ax = plt.subplots(figsize=(12, 12))
@@ -85,6 +87,97 @@ def create_geometry_plot(overall_data, category, league, season, league_display,
     st.markdown(add_download_button(fig, file_name=file_name), unsafe_allow_html=True)
     st.pyplot(fig)
 
+def build_team_geometry(match_data_df, coordinate_store, lineups_data, substitutions_data_df, season_index):
+    coordinates_data_df = get_player_game_means(coordinate_store, season_index)
+    lineups_data = lineups_data[["tournament","season","week","game_id","team","player_name", "player_id"]].drop_duplicates()
+
+    # Players are matched on the integer (game_id, player_id) pair; names are only carried along.
+    lineups_data = lineups_data.drop(columns="player_name")
+    final_merged_data = attach_match_teams(
+        pd.merge(
+            coordinates_data_df,
+            lineups_data,
+            on=["game_id", "player_id"]
+        ).sort_values(["tournament", "season", "week", "game_id", "player_name", "player_id"], kind="stable"),
+        match_data_df
+    )
+    final_merged_data = final_merged_data.drop(columns=["team","home_team","away_team","opponent_name","home_team_code","away_team_code","opponent_code"])
+
+    player_keys = pd.MultiIndex.from_arrays([final_merged_data["game_id"], final_merged_data["player_id"]])
+    time_in = (
+        substitutions_data_df.drop_duplicates(subset=["game_id", "player_in_id"])
+        .set_index(["game_id", "player_in_id"])["time"].reindex(player_keys).to_numpy(dtype=float)
+    )
+    time_out = (
+        substitutions_data_df.drop_duplicates(subset=["game_id", "player_out_id"])
+        .set_index(["game_id", "player_out_id"])["time"].reindex(player_keys).to_numpy(dtype=float)
+    )
+    is_subbed_in = ~np.isnan(time_in)
+    is_subbed_out = ~is_subbed_in & ~np.isnan(time_out)
+
+    final_merged_data["status"] = np.select([is_subbed_in, is_subbed_out], ["Subbed in", "Subbed out"], default="Starting 11")
+    final_merged_data["time"] = np.where(is_subbed_in, time_in, time_out)
+
+    results = []
+    for (tournament, season, round_, game_id), group in final_merged_data.groupby(["tournament", "season", "week", "game_id"], observed=True):
+        team_groups = group.groupby("team_code")
+        for _, team_data in team_groups:
+            team_name = team_data["team_name"].iloc[0]
+            time_points = team_data["time"].dropna().sort_values().unique().tolist()
+            max_time = max(time_points + [90])
+            time_points = [0] + time_points + [max_time]
+
+            active_players = team_data[(team_data["status"] == "Starting 11") | (team_data["status"] == "Subbed out")].copy()
+
+            if len(active_players) > 1:
+                initial_mean_distance = calculate_mean_distance(active_players)
+                initial_horizontal_spread, initial_vertical_spread = calculate_horizontal_vertical_spread(team_data)
+                results.append({
+                    "tournament": tournament,
+                    "season": season,
+                    "week": round_,
+                    "game_id": game_id,
+                    "team_name": team_name,
+                    "start_time": 0,
+                    "end_time": time_points[1],
+                    "mean_distance": initial_mean_distance,
+                    "horizontal_spread": initial_horizontal_spread,
+                    "vertical_spread": initial_vertical_spread,
+                    "active_players": active_players["player_name"].tolist()
+                })
+
+            for start, end in zip(time_points[:-1], time_points[1:]):
+                for _, substitution in team_data[(team_data["time"] > start) & (team_data["time"] <= end)].iterrows():
+                    if substitution["status"] == "Subbed in":
+                        active_players = pd.concat([active_players, substitution.to_frame().T], ignore_index=True)
+                    elif substitution["status"] == "Subbed out":
+                        active_players = active_players[active_players["player_id"] != substitution["player_id"]]
+
+                if len(active_players) > 1:
+                    mean_distance = calculate_mean_distance(active_players)
+                    horizontal_spread, vertical_spread = calculate_horizontal_vertical_spread(team_data)
+                    player_names = active_players["player_name"].tolist()
+                    results.append({
+                        "tournament": tournament,
+                        "season": season,
+                        "week": round_,
+                        "game_id": game_id,
+                        "team_name": team_name,
+                        "start_time": start,
+                        "end_time": end,
+                        "mean_distance": mean_distance,
+                        "horizontal_spread": horizontal_spread,
+                        "vertical_spread": vertical_spread,
+                        "active_players": player_names
+                    })
+
+    data = pd.DataFrame(results)
+    return data.groupby(["tournament", "season", "week", "game_id", "team_name"], observed=True).agg({
+        "mean_distance": "mean",
+        "horizontal_spread": "mean",
+        "vertical_spread": "mean"
+    }).reset_index()
+
 def main(category, league, season, league_display, season_display):
     try:
 
@@ -92,120 +185,19 @@ def main(category, league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        coordinates_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "coordinates_data")
-        lineups_data = load_filtered_json_files(directories, country_display, league_display, season_display, "lineups_data")
-        substitutions_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "substitutions_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["tournament","season","week","game_id","home_team","away_team"]]
-        coordinates_data_df = coordinates_data_df.groupby(["tournament","season","week","game_id","player_name", "player_id"]).agg({'x': 'mean', 'y': 'mean'}).reset_index()
-        lineups_data = lineups_data[["tournament","season","week","game_id","team","player_name", "player_id"]].drop_duplicates()
-
-        final_merged_data = pd.merge(
-            pd.merge(
-                coordinates_data_df,
-                lineups_data,
-                on=["tournament", "season", "week", "game_id", "player_name", "player_id"]
-            ),
-            match_data_df,
-            on=["tournament", "season", "week", "game_id"]
-        )
-        final_merged_data["team_name"] = final_merged_data.apply(lambda row: row["home_team"] if row["team"] == "home" else row["away_team"], axis=1)
-        final_merged_data = final_merged_data.drop(columns=["team","home_team","away_team"])
-
-        def check_player_status_and_time(row):
-            player_in = substitutions_data_df[
-                (substitutions_data_df["tournament"] == row["tournament"]) &
-                (substitutions_data_df["season"] == row["season"]) &
-                (substitutions_data_df["week"] == row["week"]) &
-                (substitutions_data_df["game_id"] == row["game_id"]) &
-                (substitutions_data_df["player_in"] == row["player_name"]) &
-                (substitutions_data_df["player_in_id"] == row["player_id"])
-            ]
-            player_out = substitutions_data_df[
-                (substitutions_data_df["tournament"] == row["tournament"]) &
-                (substitutions_data_df["season"] == row["season"]) &
-                (substitutions_data_df["week"] == row["week"]) &
-                (substitutions_data_df["game_id"] == row["game_id"]) &
-                (substitutions_data_df["player_out"] == row["player_name"]) &
-                (substitutions_data_df["player_out_id"] == row["player_id"])
-            ]
-
-            status = "Starting 11"
-            time = None
-            if not player_in.empty:
-                status = "Subbed in"
-                time = player_in['time'].iloc[0]
-            elif not player_out.empty:
-                status = "Subbed out"
-                time = player_out['time'].iloc[0]
-
-            return status, time
-
-        final_merged_data[['status', 'time']] = final_merged_data.apply(
-            lambda row: pd.Series(check_player_status_and_time(row)), axis=1
-        )
-
-        if category in ["Kompaktlık","Dikey Yayılım","Yatay Yayılım"]:
-            results = []
-            for (tournament, season, round_, game_id), group in final_merged_data.groupby(["tournament", "season", "week", "game_id"]):
-                team_groups = group.groupby("team_name")
-                for team_name, team_data in team_groups:
-                    time_points = team_data["time"].dropna().sort_values().unique().tolist()
-                    max_time = max(time_points + [90])
-                    time_points = [0] + time_points + [max_time]
-
-                    active_players = team_data[(team_data["status"] == "Starting 11") | (team_data["status"] == "Subbed out")].copy()
-
-                    if len(active_players) > 1:
-                        initial_mean_distance = calculate_mean_distance(active_players)
-                        initial_horizontal_spread, initial_vertical_spread = calculate_horizontal_vertical_spread(team_data)
-                        results.append({
-                            "tournament": tournament,
-                            "season": season,
-                            "week": round_,
-                            "game_id": game_id,
-                            "team_name": team_name,
-                            "start_time": 0,
-                            "end_time": time_points[1],
-                            "mean_distance": initial_mean_distance,
-                            "horizontal_spread": initial_horizontal_spread,
-                            "vertical_spread": initial_vertical_spread,
-                            "active_players": active_players["player_name"].tolist()
-                        })
-
-                    for start, end in zip(time_points[:-1], time_points[1:]):
-                        for _, substitution in team_data[(team_data["time"] > start) & (team_data["time"] <= end)].iterrows():
-                            if substitution["status"] == "Subbed in":
-                                active_players = pd.concat([active_players, substitution.to_frame().T], ignore_index=True)
-                            elif substitution["status"] == "Subbed out":
-                                active_players = active_players[active_players["player_id"] != substitution["player_id"]]
-
-                        if len(active_players) > 1:
-                            mean_distance = calculate_mean_distance(active_players)
-                            horizontal_spread, vertical_spread = calculate_horizontal_vertical_spread(team_data)
-                            player_names = active_players["player_name"].tolist()
-                            results.append({
-                                "tournament": tournament,
-                                "season": season,
-                                "week": round_,
-                                "game_id": game_id,
-                                "team_name": team_name,
-                                "start_time": start,
-                                "end_time": end,
-                                "mean_distance": mean_distance,
-                                "horizontal_spread": horizontal_spread,
-                                "vertical_spread": vertical_spread,
-                                "active_players": player_names
-                            })
-
-            data = pd.DataFrame(results)
-            overall_data = data.groupby(["tournament", "season", "week", "game_id", "team_name"]).agg({
-                "mean_distance": "mean",
-                "horizontal_spread": "mean",
-                "vertical_spread": "mean"
-            }).reset_index()
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        overall_data = read_season_artifact(directories, country_display, league_display, season_display, "team_geometry")
+        if overall_data is None:
+            overall_data = build_team_geometry(*load_many(
+                directories, country_display, league_display, season_display,
+                [
+                    {"table": "match_dimension"},
+                    {"table": "coordinate_store"},
+                    {"kind": "lineups_data"},
+                    {"kind": "substitutions_data"},
+                    {"table": "season_index"}
+                ]
+            ))
 
         last_round = match_data_df['week'].max()
 
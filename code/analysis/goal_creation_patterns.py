@@ -1,8 +1,8 @@
 import os
 import pandas as pd
 import streamlit as st
-from config import change_situations, change_body_parts, change_goal_locations, change_player_positions, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, sort_turkish, turkish_english_lower
+from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
+from code.utils.helpers import add_download_button, load_match_dimension, load_shots_enriched, add_footer, sort_turkish, turkish_english_lower
 import seaborn as sns
 import matplotlib.pyplot as plt
 
@@ -58,36 +58,12 @@ def main(category, subcategory, league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["season", "week", "game_id", "home_team", "away_team"]]
-
-        shots_data_df = shots_data_df[[
-            "season", "week", "game_id", "player_name", "player_position", "is_home", "shot_type", "body_part", "goal_type",
-            "situation", "goal_mouth_location", "player_coordinates_x", "player_coordinates_y", "time", "added_time"
-        ]]
-
-        shots_data_df = shots_data_df.merge(
-            match_data_df,
-            on=["season", "week", "game_id"],
-            how="left"
-        )
-
-        shots_data_df["team_name"] = shots_data_df.apply(
-            lambda row: row["home_team"] if row["is_home"] else row["away_team"], axis=1
-        )
-
-        shots_data_df["is_goal"] = shots_data_df["shot_type"].apply(lambda x: 1 if x == "goal" else 0)
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        shots_data_df = load_shots_enriched(directories, country_display, league_display, season_display)
 
         shot_maps_data_goals = shots_data_df[shots_data_df["is_goal"] == 1]
         shot_maps_data_goals = shot_maps_data_goals[shot_maps_data_goals['goal_type'] != "own"]
 
-        shot_maps_data_goals["situation"] = shot_maps_data_goals["situation"].replace(change_situations)
-        shot_maps_data_goals["body_part"] = shot_maps_data_goals["body_part"].replace(change_body_parts)
-        shot_maps_data_goals["goal_mouth_location"] = shot_maps_data_goals["goal_mouth_location"].replace(change_goal_locations)
-        shot_maps_data_goals["player_position"] = shot_maps_data_goals["player_position"].replace(change_player_positions)
         shot_maps_data_goals['is_home'] = shot_maps_data_goals['is_home'].apply(lambda x: 'İç Saha' if x else 'Deplasman')
 
         if category == "Senaryo":
@@ -95,11 +71,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "situation"])
+                    .groupby(["team_name", "situation"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -112,11 +88,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["situation", "team_name"])
+                    .groupby(["situation", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("situation")["is_goal"].sum().reset_index(name="total_goals_by_situation"),
+                        shot_maps_data_goals.groupby("situation", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_situation"),
                         on="situation",
                         how="left"
                     )
@@ -132,11 +108,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "body_part"])
+                    .groupby(["team_name", "body_part"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -149,11 +125,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["body_part", "team_name"])
+                    .groupby(["body_part", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("body_part")["is_goal"].sum().reset_index(name="total_goals_by_body_part"),
+                        shot_maps_data_goals.groupby("body_part", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_body_part"),
                         on="body_part",
                         how="left"
                     )
@@ -169,11 +145,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "goal_mouth_location"])
+                    .groupby(["team_name", "goal_mouth_location"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -186,11 +162,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["goal_mouth_location", "team_name"])
+                    .groupby(["goal_mouth_location", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("goal_mouth_location")["is_goal"].sum().reset_index(name="total_goals_by_location"),
+                        shot_maps_data_goals.groupby("goal_mouth_location", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_location"),
                         on="goal_mouth_location",
                         how="left"
                     )
@@ -230,11 +206,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "time_interval"])
+                    .groupby(["team_name", "time_interval"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -247,11 +223,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["time_interval", "team_name"])
+                    .groupby(["time_interval", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("time_interval")["is_goal"].sum().reset_index(name="total_goals_by_time"),
+                        shot_maps_data_goals.groupby("time_interval", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_time"),
                         on="time_interval",
                         how="left"
                     )
@@ -267,11 +243,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "player_position"])
+                    .groupby(["team_name", "player_position"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -284,11 +260,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["player_position", "team_name"])
+                    .groupby(["player_position", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("player_position")["is_goal"].sum().reset_index(name="total_goals_by_location"),
+                        shot_maps_data_goals.groupby("player_position", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_location"),
                         on="player_position",
                         how="left"
                     )
@@ -304,11 +280,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             if subcategory == "Takım Payına Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["team_name", "is_home"])
+                    .groupby(["team_name", "is_home"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("team_name")["is_goal"].sum().reset_index(name="total_goals"),
+                        shot_maps_data_goals.groupby("team_name", observed=True)["is_goal"].sum().reset_index(name="total_goals"),
                         on="team_name",
                         how="left"
                     )
@@ -321,11 +297,11 @@ def main(category, subcategory, league, season, league_display, season_display):
             elif subcategory == "Takımlar Arası Paya Göre":
                 team_goal_types_df = (
                     shot_maps_data_goals
-                    .groupby(["is_home", "team_name"])
+                    .groupby(["is_home", "team_name"], observed=True)
                     .size()
                     .reset_index(name="goal_count")
                     .merge(
-                        shot_maps_data_goals.groupby("is_home")["is_goal"].sum().reset_index(name="total_goals_by_location"),
+                        shot_maps_data_goals.groupby("is_home", observed=True)["is_goal"].sum().reset_index(name="total_goals_by_location"),
                         on="is_home",
                         how="left"
                     )
@@ -2,7 +2,8 @@ import os
 import pandas as pd
 import streamlit as st
 from config import event_type_translations, event_colors, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, turkish_upper, turkish_english_lower
+from code.utils.helpers import add_download_button, load_many, turkish_upper, turkish_english_lower, replace_labels
+from code.utils.interning import add_player_codes
 from mplsoccer import VerticalPitch
 import matplotlib.pyplot as plt
 
@@ -16,12 +17,8 @@ def fill_opponent_team_name(df):
     df["opponent_team_name"] = df.groupby("id")["opponent_team_name"].transform(lambda x: x.ffill().bfill())
     return df
 
-def merge_match_data(match_data_df, shots_data_df):
-    filtered_shots = shots_data_df[shots_data_df["shot_type"] == "goal"][[
-        "tournament", "season", "week", "game_id", "player_name", "is_home", "goal_type", "xg"
-    ]]
-    merged_df = match_data_df.merge(filtered_shots, on=["tournament", "season", "week", "game_id"])
-    return merged_df[~merged_df["goal_type"].isin(["penalty", "own"])]
+def filter_open_play_goals(shots_data_df):
+    return shots_data_df[~shots_data_df["goal_type"].isin(["penalty", "own"])]
 
 def create_goal_network_plot(side_data, league, season, league_display, season_display, team, last_round, plot_type, side):
     if plot_type == "Birleştir":
@@ -245,13 +242,19 @@ def main(league, season, league_display, season_display, team=None, plot_type=No
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
-        goal_networks_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "goal_networks_data")
+        match_data_df, shots_data_df, goal_networks_data_df, season_index = load_many(
+            directories, country_display, league_display, season_display,
+            [
+                {"table": "match_dimension"},
+                {"table": "shots_enriched"},
+                {"kind": "goal_networks_data"},
+                {"table": "season_index"}
+            ]
+        )
+        goal_networks_data_df = add_player_codes(goal_networks_data_df, season_index)
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
         match_data_df = match_data_df[["tournament", "season", "week", "game_id", "home_team", "away_team"]]
-        match_shots_data_df = merge_match_data(match_data_df, shots_data_df)
+        match_shots_data_df = filter_open_play_goals(shots_data_df[shots_data_df["is_goal"] == 1])
 
         goal_networks_data_df["team_name"] = None
         goal_networks_data_df["opponent_team_name"] = None
@@ -259,18 +262,18 @@ def main(league, season, league_display, season_display, team=None, plot_type=No
         for game_id in match_shots_data_df["game_id"].unique():
             match_data = match_shots_data_df[match_shots_data_df["game_id"] == game_id]
             for _, row in match_data.iterrows():
-                team_name = row["home_team"] if row["is_home"] else row["away_team"]
-                opponent_team_name = row["away_team"] if row["is_home"] else row["home_team"]
+                team_name = row["team_name"]
+                opponent_team_name = row["opponent_name"]
 
                 goal_networks_data_df.loc[
                     (goal_networks_data_df["game_id"] == game_id) &
-                    (goal_networks_data_df["player_name"] == row["player_name"]) &
+                    (goal_networks_data_df["player_code"] == row["player_code"]) &
                     (goal_networks_data_df["event_type"] == "goal"), "team_name"
                 ] = team_name
 
                 goal_networks_data_df.loc[
                     (goal_networks_data_df["game_id"] == game_id) &
-                    (goal_networks_data_df["player_name"] == row["player_name"]) &
+                    (goal_networks_data_df["player_code"] == row["player_code"]) &
                     (goal_networks_data_df["event_type"] == "goal"), "opponent_team_name"
                 ] = opponent_team_name
 
@@ -282,7 +285,7 @@ def main(league, season, league_display, season_display, team=None, plot_type=No
                 goal_networks_data_df.loc[group.index, ["player_x", "player_y"]] = 100 - group[["player_x", "player_y"]]
 
         goal_networks_data_df = goal_networks_data_df.merge(match_data_df, on=["tournament", "season", "week", "game_id"])
-        goal_networks_data_df["event_type"] = goal_networks_data_df["event_type"].replace(event_type_translations)
+        goal_networks_data_df["event_type"] = replace_labels(goal_networks_data_df["event_type"], event_type_translations)
 
         if side == "Attığı":
             side_data = goal_networks_data_df[goal_networks_data_df["team_name"] == team]
@@ -1,40 +1,24 @@
 from config import match_performance_translations, match_performance_posneg, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import load_filtered_json_files, add_footer, add_download_button, turkish_english_lower
+from code.utils.helpers import load_many, add_footer, add_download_button, turkish_english_lower, replace_labels
+from code.utils.match_stats import get_cube_field
 import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 
 plt.style.use(PLOT_STYLE)
 
-def clean_percent_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                dataframe.at[index, col] = row[col].replace("%", "").strip()
-    return dataframe
-
-def clean_parenthesis_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                if "(" in row[col]:
-                    dataframe.at[index, col] = row[col].split("(")[0].strip()
-    return dataframe
-
-def classify_difference(row):
-     if (row["stats_difference"] > 0 and row["score_difference"] > 0):
-         return "Galibiyet"
-     elif (row["stats_difference"] < 0 and row["score_difference"] < 0):
-         return "Galibiyet"
-     elif (row["stats_difference"] > 0 and row["score_difference"] < 0):
-         return "Mağlubiyet"
-     elif (row["stats_difference"] < 0 and row["score_difference"] > 0):
-         return "Mağlubiyet"
-     elif (row["stats_difference"] > 0 and row["score_difference"] == 0):
-         return "Beraberlik"
-     elif (row["stats_difference"] < 0 and row["score_difference"] == 0):
-         return "Beraberlik"
+def classify_difference(stats_difference, score_difference):
+    return np.select(
+        [
+            ((stats_difference > 0) & (score_difference > 0)) | ((stats_difference < 0) & (score_difference < 0)),
+            ((stats_difference > 0) & (score_difference < 0)) | ((stats_difference < 0) & (score_difference > 0)),
+            ((stats_difference > 0) | (stats_difference < 0)) & (score_difference == 0)
+        ],
+        ["Galibiyet", "Mağlubiyet", "Beraberlik"],
+        default=None
+    )
 
 def correct_stats_difference(data):
     galibiyet_indices = data[data["difference_category"] == "Galibiyet"].index
@@ -53,7 +37,7 @@ def create_match_statistics_impact_analysis_plot(merged_data, selected_variable,
 
     merged_data["score_difference"] = merged_data["home_score"] - merged_data["away_score"]
 
-    merged_data["difference_category"] = merged_data.apply(classify_difference, axis=1)
+    merged_data["difference_category"] = classify_difference(merged_data["stats_difference"], merged_data["score_difference"])
     merged_data = correct_stats_difference(merged_data)
 
     merged_data = merged_data.dropna()
@@ -106,78 +90,40 @@ def main(league, season, league_display, season_display, selected_variable):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        match_stats_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_stats_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
+        match_data_df, cube = load_many(
+            directories, country_display, league_display, season_display,
+            [
+                {"table": "scorelines"},
+                {"table": "match_stats_cube"}
+            ]
+        )
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["tournament", "season", "week", "game_id", "home_team", "away_team"]]
+        match_data_df = match_data_df[["tournament", "season", "week", "game_id", "home_team", "away_team", "home_score", "away_score"]]
 
-        match_stats_data_df = match_stats_data_df[match_stats_data_df["period"] == "ALL"]
-        match_stats_data_df = match_stats_data_df.rename(columns={
-            "home_team":"home_team_stat",
-            "away_team":"away_team_stat"
-        })
-        percent_keywords = ["Ball possession", "Tackles won", "Duels"]
-        parenthesis_keywords = ["Final third phase", "Long balls", "Crosses", "Ground duels", "Aerial duels", "Dribbles"]
-        target_columns = ["home_team_stat", "away_team_stat"]
-        match_stats_data_df = clean_percent_columns(match_stats_data_df, percent_keywords, target_columns)
-        match_stats_data_df = clean_parenthesis_columns(match_stats_data_df, parenthesis_keywords, target_columns)
-
-        shots_data_df = shots_data_df.merge(
-            match_data_df,
-            on=["tournament", "season", "week", "game_id"],
-            how="left"
-        )
-        shots_data_df["team_name"] = shots_data_df.apply(
-            lambda row: row["home_team"] if row["is_home"] else row["away_team"], axis=1
-        )
-        shots_data_df["is_goal"] = shots_data_df["shot_type"].apply(lambda x: 1 if x == "goal" else 0)
-        shot_maps_data_goal = shots_data_df[shots_data_df["is_goal"] == 1]
-        shot_maps_data_goal = shot_maps_data_goal[["tournament", "season", "week", "game_id", "team_name"]]
-
-        match_data_df = match_data_df.copy()
-        match_data_df.loc[:, "home_score"] = 0
-        match_data_df.loc[:, "away_score"] = 0
-
-        for i, row in match_data_df.iterrows():
-            home_team_shots = len(shot_maps_data_goal[(shot_maps_data_goal["game_id"] == row["game_id"]) & (shot_maps_data_goal["team_name"] == row["home_team"])])
-            away_team_shots = len(shot_maps_data_goal[(shot_maps_data_goal["game_id"] == row["game_id"]) & (shot_maps_data_goal["team_name"] == row["away_team"])])
-            match_data_df.at[i, "home_score"] = home_team_shots
-            match_data_df.at[i, "away_score"] = away_team_shots
-
-        merged_data = pd.merge(
-            match_data_df,
-            match_stats_data_df,
-            on=["tournament", "season", "week", "game_id"],
-            how="inner"
-        )
+        stat_names = replace_labels(pd.Series(cube["stat_names"], dtype=object), match_performance_translations).to_numpy(dtype=object)
 
-        merged_data["stat_name"] = merged_data["stat_name"].replace(match_performance_translations)
-
-        if "(Başarı)" in selected_variable or "(Toplam)" in selected_variable:
-            base_stat = selected_variable.split(" (")[0]
-            merged_data = merged_data[merged_data["stat_name"] == base_stat]
-
-            if "(Başarı)" in selected_variable:
-                merged_data["home_team_stat"] = merged_data["home_team_stat"].apply(
-                    lambda x: int(x.split("/")[0]) / int(x.split("/")[1]) * 100 if "/" in x else None
-                )
-                merged_data["away_team_stat"] = merged_data["away_team_stat"].apply(
-                    lambda x: int(x.split("/")[0]) / int(x.split("/")[1]) * 100 if "/" in x else None
-                )
-            elif "(Toplam)" in selected_variable:
-                merged_data["home_team_stat"] = merged_data["home_team_stat"].apply(
-                    lambda x: int(x.split("/")[1]) if "/" in x else None
-                )
-                merged_data["away_team_stat"] = merged_data["away_team_stat"].apply(
-                    lambda x: int(x.split("/")[1]) if "/" in x else None
-                )
+        if "(Başarı)" in selected_variable:
+            stat_codes = np.flatnonzero(stat_names == selected_variable.split(" (")[0])
+            stat_values = get_cube_field(cube, "ALL", "ratio")[:, :, stat_codes]
+        elif "(Toplam)" in selected_variable:
+            stat_codes = np.flatnonzero(stat_names == selected_variable.split(" (")[0])
+            stat_values = get_cube_field(cube, "ALL", "total")[:, :, stat_codes]
         else:
-            merged_data = merged_data[merged_data["stat_name"] == selected_variable]
+            stat_codes = np.flatnonzero(stat_names == selected_variable)
+            stat_values = get_cube_field(cube, "ALL", "value")[:, :, stat_codes]
+
+        game_codes, stat_positions = np.nonzero(cube["present"][cube["periods"].get_loc("ALL")][:, stat_codes])
+        stats_df = pd.DataFrame({
+            "game_id": cube["game_ids"][game_codes],
+            "stat_name": stat_names[stat_codes[stat_positions]],
+            "home_team_stat": stat_values[game_codes, 0, stat_positions],
+            "away_team_stat": stat_values[game_codes, 1, stat_positions]
+        })
+
+        merged_data = pd.merge(match_data_df, stats_df, on="game_id", how="inner")
 
-        merged_data["home_team_stat"] = pd.to_numeric(merged_data["home_team_stat"], errors="coerce").fillna(0)
-        merged_data["away_team_stat"] = pd.to_numeric(merged_data["away_team_stat"], errors="coerce").fillna(0)
+        merged_data["home_team_stat"] = merged_data["home_team_stat"].fillna(0)
+        merged_data["away_team_stat"] = merged_data["away_team_stat"].fillna(0)
 
         last_round = match_data_df["week"].max()
 
@@ -1,30 +1,17 @@
 from config import match_performance_translations, LEAGUE_COUNTRY_LOOKUP
 from code.utils.plotters import plot_boxplot, plot_stacked_bar_chart, plot_stacked_horizontal_bar, plot_horizontal_bar
-from code.utils.helpers import load_filtered_json_files, turkish_english_lower
+from code.utils.helpers import load_match_stats_cube, turkish_english_lower, replace_labels
+from code.utils.match_stats import get_cube_field, get_match_stats_frame, reduce_by_team
 import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-def clean_percent_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                dataframe.at[index, col] = row[col].replace("%", "").strip()
-    return dataframe
-
-def clean_parenthesis_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                if "(" in row[col]:
-                    dataframe.at[index, col] = row[col].split("(")[0].strip()
-    return dataframe
-
-def create_performance_plot(master_df, result_all_stats_df, subcategory, league, season, league_display, season_display, last_round):
+def create_performance_plot(cube, result_all_stats_df, subcategory, league, season, league_display, season_display, last_round):
     if subcategory == "Topa Sahip Olma":
         possession_data = result_all_stats_df[result_all_stats_df["stat_name"] == "Topa Sahip Olma"]
 
-        median_possession_by_team = possession_data.groupby("team_name")["stat_value"].median().reset_index()
+        median_possession_by_team = possession_data.groupby("team_name", observed=True)["stat_value"].median().reset_index()
         median_possession_by_team = median_possession_by_team.sort_values("stat_value", ascending=False)
 
         sorted_team_names = median_possession_by_team["team_name"]
@@ -47,7 +34,8 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
             columns="stat_name",
             values="stat_value",
             aggfunc="sum",
-            fill_value=0
+            fill_value=0,
+            observed=True
         )
 
         team_passing_stats["Toplam Pas"] = team_passing_stats["Paslar"]
@@ -106,7 +94,8 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
             columns="stat_name",
             values="stat_value",
             aggfunc="sum",
-            fill_value=0
+            fill_value=0,
+            observed=True
         )
 
         team_shooting_stats["Toplam Şut"] = team_shooting_stats.sum(axis=1)
@@ -143,7 +132,8 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
             columns="stat_name",
             values="stat_value",
             aggfunc="sum",
-            fill_value=0
+            fill_value=0,
+            observed=True
         )
 
         team_penalty_area_stats["Toplam Şut"] = team_penalty_area_stats.sum(axis=1)
@@ -171,7 +161,7 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
     elif subcategory == "Ceza Sahasında Topla Buluşma":
         penalty_area_touch_data = result_all_stats_df[
             result_all_stats_df["stat_name"] == "Ceza Sahasında Topla Buluşma"
-        ].groupby("team_name", as_index=False)["stat_value"].sum()
+        ].groupby("team_name", as_index=False, observed=True)["stat_value"].sum()
 
         penalty_area_touch_data["stat_value"] = penalty_area_touch_data["stat_value"].astype(int)
 
@@ -192,7 +182,7 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
     elif subcategory == "Üçüncü Bölgeye Giriş Sayısı":
         final_third_entry_data = result_all_stats_df[
             result_all_stats_df["stat_name"] == "Üçüncü Bölgeye Girişler"
-        ].groupby("team_name", as_index=False)["stat_value"].sum()
+        ].groupby("team_name", as_index=False, observed=True)["stat_value"].sum()
 
         final_third_entry_data["stat_value"] = final_third_entry_data["stat_value"].astype(int)
 
@@ -216,16 +206,14 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
         ]
 
         final_third_action_data[["Başarılı Aksiyon", "Toplam Aksiyon"]] = (
-            final_third_action_data["stat_value"]
-            .str.split("/", expand=True)
-            .astype(int)
+            final_third_action_data[["stat_success", "stat_total"]].astype(int)
         )
 
         final_third_action_data["Başarısız Aksiyon"] = (
             final_third_action_data["Toplam Aksiyon"] - final_third_action_data["Başarılı Aksiyon"]
         )
 
-        team_final_third_actions = final_third_action_data.groupby("team_name", as_index=True).sum()
+        team_final_third_actions = final_third_action_data.groupby("team_name", as_index=True, observed=True).sum()
 
         plot_stacked_horizontal_bar(
             data=team_final_third_actions,
@@ -243,28 +231,14 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
             ascending=True
         )
     elif subcategory == "Yaptığı ile Kendisine Yapılan Faul Sayısı Farkı":
-        foul_data = master_df[master_df["stat_name"] == "Fauller"].copy()
+        fouls = get_cube_field(cube, "ALL", "value")[:, :, cube["stat_names"] == "Fauller"]
 
-        foul_data["home_team_stat"] = pd.to_numeric(foul_data["home_team_stat"], errors="coerce")
-        foul_data["away_team_stat"] = pd.to_numeric(foul_data["away_team_stat"], errors="coerce")
-
-        foul_data = foul_data.dropna(subset=["home_team_stat", "away_team_stat"])
-
-        fouls_home = foul_data.groupby("home_team").agg(
-            Yaptigi=("home_team_stat", "sum"),
-            Yapilan=("away_team_stat", "sum")
-        ).reset_index().rename(columns={"home_team": "team"})
-
-        fouls_away = foul_data.groupby("away_team").agg(
-            Yaptigi=("away_team_stat", "sum"),
-            Yapilan=("home_team_stat", "sum")
-        ).reset_index().rename(columns={"away_team": "team"})
-
-        total_fouls_summary = (
-            pd.concat([fouls_home, fouls_away], axis=0)
-            .groupby("team", as_index=False)
-            .sum()
-        )
+        total_fouls_summary = pd.DataFrame({
+            "team": cube["teams"],
+            "Yaptigi": reduce_by_team(cube, fouls).sum(axis=1),
+            "Yapilan": reduce_by_team(cube, fouls, opponent=True).sum(axis=1)
+        })
+        total_fouls_summary = total_fouls_summary[reduce_by_team(cube, (~np.isnan(fouls)).astype(float)).sum(axis=1) > 0]
 
         total_fouls_summary["Faul Farkı"] = (
             total_fouls_summary["Yaptigi"] - total_fouls_summary["Yapilan"]
@@ -288,15 +262,15 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
     elif subcategory == "Faul Başına Kart Sayısı":
         fouls_data = result_all_stats_df[
             result_all_stats_df["stat_name"] == "Fauller"
-        ].groupby("team_name", as_index=False)["stat_value"].sum().rename(columns={"stat_value": "Faul Sayısı"})
+        ].groupby("team_name", as_index=False, observed=True)["stat_value"].sum().rename(columns={"stat_value": "Faul Sayısı"})
 
         yellow_cards_data = result_all_stats_df[
             result_all_stats_df["stat_name"] == "Sarı Kartlar"
-        ].groupby("team_name", as_index=False)["stat_value"].sum().rename(columns={"stat_value": "Sarı Kart Sayısı"})
+        ].groupby("team_name", as_index=False, observed=True)["stat_value"].sum().rename(columns={"stat_value": "Sarı Kart Sayısı"})
 
         red_cards_data = result_all_stats_df[
             result_all_stats_df["stat_name"] == "Kırmızı Kartlar"
-        ].groupby("team_name", as_index=False)["stat_value"].sum().rename(columns={"stat_value": "Kırmızı Kart Sayısı"})
+        ].groupby("team_name", as_index=False, observed=True)["stat_value"].sum().rename(columns={"stat_value": "Kırmızı Kart Sayısı"})
 
         cards_data = pd.merge(
             yellow_cards_data,
@@ -333,16 +307,14 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
         long_pass_data = result_all_stats_df[result_all_stats_df["stat_name"] == "Uzun Paslar"]
 
         long_pass_data[["Başarılı Uzun Pas", "Toplam Uzun Pas"]] = (
-            long_pass_data["stat_value"]
-            .str.split("/", expand=True)
-            .astype(int)
+            long_pass_data[["stat_success", "stat_total"]].astype(int)
         )
 
         long_pass_data["Başarısız Uzun Pas"] = (
             long_pass_data["Toplam Uzun Pas"] - long_pass_data["Başarılı Uzun Pas"]
         )
 
-        grouped_long_pass_data = long_pass_data.groupby("team_name", as_index=True).sum()
+        grouped_long_pass_data = long_pass_data.groupby("team_name", as_index=True, observed=True).sum()
 
         plot_stacked_horizontal_bar(
             data=grouped_long_pass_data,
@@ -363,16 +335,14 @@ def create_performance_plot(master_df, result_all_stats_df, subcategory, league,
         crossing_data = result_all_stats_df[result_all_stats_df["stat_name"] == "Ortalar"]
 
         crossing_data[["Başarılı Orta", "Toplam Orta"]] = (
-            crossing_data["stat_value"]
-            .str.split("/", expand=True)
-            .astype(int)
+            crossing_data[["stat_success", "stat_total"]].astype(int)
         )
 
         crossing_data["Başarısız Orta"] = (
             crossing_data["Toplam Orta"] - crossing_data["Başarılı Orta"]
         )
 
-        grouped_crossing_data = crossing_data.groupby("team_name", as_index=True).sum()
+        grouped_crossing_data = crossing_data.groupby("team_name", as_index=True, observed=True).sum()
 
         plot_stacked_horizontal_bar(
             data=grouped_crossing_data,
@@ -397,52 +367,14 @@ def main(subcategory, league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_stats_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_stats_data")
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["game_id","home_team","away_team"]]
-
-        match_stats_data_df = match_stats_data_df[match_stats_data_df["period"] == "ALL"]
-        match_stats_data_df = match_stats_data_df.rename(columns={
-            "home_team":"home_team_stat",
-            "away_team":"away_team_stat"
-        })
-
-        percent_keywords = ["Ball possession", "Tackles won", "Duels"]
-        parenthesis_keywords = ["Final third phase", "Long balls", "Crosses", "Ground duels", "Aerial duels", "Dribbles"]
-        target_columns = ["home_team_stat", "away_team_stat"]
-
-        match_stats_data_df = clean_percent_columns(match_stats_data_df, percent_keywords, target_columns)
-        match_stats_data_df = clean_parenthesis_columns(match_stats_data_df, parenthesis_keywords, target_columns)
-
-        master_df = match_stats_data_df.merge(
-            match_data_df,
-            on="game_id"
-        )
-
-        master_df["stat_name"] = master_df["stat_name"].replace(match_performance_translations)
-
-        all_stats_df_list = []
-
-        for stat in master_df["stat_name"].unique():
-            stat_df = master_df[master_df["stat_name"] == stat]
-            temp_df = pd.DataFrame({
-                "team_name": pd.concat([stat_df["home_team"], stat_df["away_team"]]),
-                "stat_name": [stat] * len(stat_df) * 2,
-                "stat_value": pd.concat([stat_df["home_team_stat"], stat_df["away_team_stat"]])
-            })
-            all_stats_df_list.append(temp_df)
-
-        result_all_stats_df = pd.concat(all_stats_df_list, ignore_index=True)
-        result_all_stats_df = result_all_stats_df.reset_index(drop=True)
+        cube = load_match_stats_cube(directories, country_display, league_display, season_display)
+        cube = {**cube, "stat_names": replace_labels(pd.Series(cube["stat_names"], dtype=object), match_performance_translations).to_numpy(dtype=object)}
 
-        result_all_stats_df.loc[~result_all_stats_df["stat_value"].str.contains("/", na=False), "stat_value"] = \
-            pd.to_numeric(result_all_stats_df["stat_value"], errors="coerce")
+        result_all_stats_df = get_match_stats_frame(cube, "ALL")
 
-        last_round = master_df["week"].max()
+        last_round = cube["weeks"].max()
 
-        create_performance_plot(master_df, result_all_stats_df, subcategory, league, season, league_display, season_display, last_round)
+        create_performance_plot(cube, result_all_stats_df, subcategory, league, season, league_display, season_display, last_round)
 
     except Exception as e:
         st.error("Uygun veri bulunamadı.")
@@ -1,13 +1,15 @@
 import os
 import streamlit as st
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_upper, turkish_english_lower
+from code.utils.helpers import add_download_button, load_coordinate_store, load_match_dimension, load_season_index, add_footer, turkish_upper, turkish_english_lower
+from code.utils.coordinate_store import get_player_team_coordinates
+from code.utils.interning import get_player_codes, get_team_code
 from mplsoccer import VerticalPitch
 import matplotlib.pyplot as plt
 
 plt.style.use(PLOT_STYLE)
 
-def create_player_heatmap_plot(filtered_hmap_data_df, league, season, league_display, season_display, team, last_round, player_name):
+def create_player_heatmap_plot(x, y, league, season, league_display, season_display, team, last_round, player_name):
 
     pitch = VerticalPitch(
         pitch_type='opta',
@@ -19,8 +21,8 @@ def create_player_heatmap_plot(filtered_hmap_data_df, league, season, league_dis
     fig, ax = pitch.draw(figsize=(16, 16))
 
     pitch.kdeplot(
-        filtered_hmap_data_df["x"],
-        filtered_hmap_data_df["y"],
+        x,
+        y,
         ax=ax,
         fill=True,
         cmap="Reds",
@@ -57,31 +59,15 @@ def main(league, season, league_display, season_display, team, player):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        heat_maps_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "coordinates_data")
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        coordinate_store = load_coordinate_store(directories, country_display, league_display, season_display)
+        season_index = load_season_index(directories, country_display, league_display, season_display)
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[['game_id', 'tournament', 'season', 'week', 'home_team', 'away_team']]
-
-        hmap_data_df = heat_maps_data_df.merge(
-            match_data_df,
-            on=['game_id', 'tournament', 'season', 'week'],
-            how='left'
-        )
-
-        hmap_data_df['team_name'] = hmap_data_df.apply(
-            lambda row: row['home_team'] if row['team'] == 'home' else row['away_team'],
-            axis=1
-        )
-
-        filtered_hmap_data_df = hmap_data_df[
-            (hmap_data_df['team_name'] == team) &
-            (hmap_data_df['player_name'] == player)
-        ]
+        x, y = get_player_team_coordinates(coordinate_store, match_data_df, get_player_codes(season_index, player), get_team_code(season_index, team))
 
         last_round = match_data_df['week'].max()
 
-        create_player_heatmap_plot(filtered_hmap_data_df, league, season, league_display, season_display, team, last_round, player)
+        create_player_heatmap_plot(x, y, league, season, league_display, season_display, team, last_round, player)
 
     except Exception as e:
         st.error("Uygun veri bulunamadı.")
@@ -1,7 +1,10 @@
 import os
+import pandas as pd
 import streamlit as st
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_english_lower
+from code.utils.helpers import add_download_button, load_match_dimension, load_player_match_matrix, load_season_index, add_footer, turkish_english_lower
+from code.utils.interning import get_player_codes, get_team_code
+from code.utils.player_match_matrix import get_stat_rows
 import matplotlib.ticker as mticker
 from matplotlib.ticker import MultipleLocator
 import matplotlib.pyplot as plt
@@ -90,23 +93,16 @@ def main(league, season, league_display, season_display, team, player):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        lineups_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "lineups_data")
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        season_index = load_season_index(directories, country_display, league_display, season_display)
+        team_code = get_team_code(season_index, team)
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["tournament","season","week","game_id","home_team","away_team"]]
-
-        player_rating_df = match_data_df.merge(
-            lineups_data_df,
-            on=["tournament","season","week","game_id"]
-        )
-
-        player_rating_df = player_rating_df[player_rating_df["stat_name"] == "rating"]
-        player_rating_df["team_name"] = player_rating_df.apply(
-            lambda row: row["home_team"] if row["team"] == "home" else row["away_team"], axis=1
+        player_match_matrix = load_player_match_matrix(directories, country_display, league_display, season_display)
+        player_rating_df = get_stat_rows(player_match_matrix, "rating", team_code)
+        rating_df_filtered_player = pd.concat(
+            [get_stat_rows(player_match_matrix, "rating", team_code, player_code) for player_code in get_player_codes(season_index, player)],
+            ignore_index=True
         )
-        player_rating_df = player_rating_df[player_rating_df['team_name'] == team]
-        rating_df_filtered_player = player_rating_df[player_rating_df["player_name"] == player]
 
         team_min_max_rating_df = player_rating_df.groupby(["team_name", "week"])["stat_value"].agg(["min", "max", "mean"]).reset_index()
 
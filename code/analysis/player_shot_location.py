@@ -1,7 +1,10 @@
 import os
+import pandas as pd
 import streamlit as st
-from config import change_situations, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_upper, turkish_english_lower
+from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
+from code.utils.helpers import add_download_button, load_entity_rows, load_match_dimension, load_season_index, add_footer, turkish_upper, turkish_english_lower
+from code.utils.entity_index import get_player_rows
+from code.utils.interning import get_player_codes, get_team_code
 from mplsoccer import VerticalPitch
 import matplotlib.pyplot as plt
 
@@ -19,8 +22,8 @@ def create_player_shot_location_plot(df_goals, df_non_goals, league, season, lea
     fig, ax = pitch.draw(figsize=(16, 16))
 
     pitch.scatter(
-        df_non_goals["player_coordinates_x"],
-        df_non_goals["player_coordinates_y"],
+        df_non_goals["player_coordinates_x_flipped"],
+        df_non_goals["player_coordinates_y_flipped"],
         edgecolors="black",
         c="gray",
         marker="h",
@@ -31,8 +34,8 @@ def create_player_shot_location_plot(df_goals, df_non_goals, league, season, lea
     )
 
     pitch.scatter(
-        df_goals["player_coordinates_x"],
-        df_goals["player_coordinates_y"],
+        df_goals["player_coordinates_x_flipped"],
+        df_goals["player_coordinates_y_flipped"],
         edgecolors="black",
         c="red",
         marker="h",
@@ -99,34 +102,12 @@ def main(league, season, league_display, season_display, team, player):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
+        match_data = load_match_dimension(directories, country_display, league_display, season_display)
+        season_index = load_season_index(directories, country_display, league_display, season_display)
+        team_code = get_team_code(season_index, team)
 
-        match_data = match_data[match_data["status"].isin(["Ended","Retired"])]
-        match_data = match_data[["season", "week", "game_id", "home_team", "away_team"]]
-
-        shots_data_df = shots_data_df[[
-            "season", "week", "game_id", "player_name", "is_home", "shot_type", "situation",
-            "goal_mouth_location", "player_coordinates_x", "player_coordinates_y"
-        ]]
-
-        shots_data_df = shots_data_df.merge(
-            match_data,
-            on=["season", "week", "game_id"],
-            how="left"
-        )
-
-        shots_data_df["team_name"] = shots_data_df.apply(
-            lambda row: row["home_team"] if row["is_home"] else row["away_team"], axis=1
-        )
-
-        shots_data_df["is_goal"] = shots_data_df["shot_type"].apply(lambda x: 1 if x == "goal" else 0)
-        shots_data_df["player_coordinates_x"] = 100 - shots_data_df["player_coordinates_x"]
-        shots_data_df["player_coordinates_y"] = 100 - shots_data_df["player_coordinates_y"]
-
-        shots_data_df["situation"] = shots_data_df["situation"].replace(change_situations)
-
-        player_data = shots_data_df[(shots_data_df["team_name"] == team) & (shots_data_df["player_name"] == player)]
+        entity_rows = load_entity_rows(directories, country_display, league_display, season_display)
+        player_data = pd.concat([get_player_rows(entity_rows, team_code, player_code) for player_code in get_player_codes(season_index, player)])
 
         df_goals = player_data[player_data["is_goal"] == 1]
         df_non_goals = player_data[player_data["is_goal"] == 0]
@@ -7,9 +7,10 @@ import matplotlib.colors as mcolors
 import matplotlib.pyplot as plt
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import load_filtered_json_files, add_footer, add_download_button, turkish_english_lower
-from code.models.dixon_coles import solve_parameters_cached, dixon_coles_simulate_match_cached
-from code.models.bradley_terry import solve_bt_ratings_cached, bt_forecast_match_cached
+from code.utils.helpers import load_filtered_json_files, get_dataset_version, read_season_artifact, add_footer, add_download_button, turkish_english_lower
+from code.models.dixon_coles import solve_parameters_cached, dixon_coles_predict_round_cached
+from code.models.bradley_terry import get_venue_rating_name, solve_bt_ratings_cached, bt_forecast_match_cached
+from code.utils.model_fits import get_model_fit_directory
 
 plt.style.use(PLOT_STYLE)
 
@@ -27,9 +28,15 @@ def create_predictive_analytics_plot(
         plot_type,
         first_n_goals,
         bt_prob,
-        params=None
+        params=None,
+        xi=0.0,
+        round_summary=None
 ):
 
+    footer_text = f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır."
+    if xi:
+        footer_text += f"\nMaçlar zaman ağırlıklıdır (ξ = {xi:g})."
+
     if selected_model == "Dixon-Coles":
         home_win_prob = np.sum(np.tril(model_df, -1)) * 100
         draw_prob = np.sum(np.diag(model_df)) * 100
@@ -69,7 +76,7 @@ def create_predictive_analytics_plot(
                 y=0.89
             )
 
-            add_footer(fig, x=0.98, y=-0.05, fontsize=8, extra_text=f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır.")
+            add_footer(fig, x=0.98, y=-0.05, fontsize=8, extra_text=footer_text)
             plt.tight_layout()
 
         elif plot_type == "Sıralı":
@@ -115,7 +122,7 @@ def create_predictive_analytics_plot(
 
             ax.grid(True, linestyle="--", alpha=0.7)
 
-            add_footer(fig, x=0.98, y=-0.02, fontsize=8, extra_text=f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır.")
+            add_footer(fig, x=0.98, y=-0.02, fontsize=8, extra_text=footer_text)
             plt.tight_layout()
 
         elif plot_type == "Özet":
@@ -183,7 +190,7 @@ def create_predictive_analytics_plot(
                 ax.grid(axis="y", linestyle="--", alpha=0.7)
                 ax.set_xticklabels(group.keys(), rotation=0, ha="center")
 
-            add_footer(fig, x=0.98, y=-0.02, fontsize=8, extra_text=f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır.")
+            add_footer(fig, x=0.98, y=-0.02, fontsize=8, extra_text=footer_text)
             plt.tight_layout()
 
         elif plot_type == "Takım Gücü":
@@ -236,12 +243,45 @@ def create_predictive_analytics_plot(
             ax.invert_yaxis()
             ax.grid(True, linestyle="--", alpha=0.7)
             ax.legend(loc="upper center", bbox_to_anchor=(0.5, 1.08), ncol=2, frameon=False, fontsize=10)
-            add_footer(fig, x=0.96, y=-0.04, fontsize=8, extra_text=f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır.")
+            add_footer(fig, x=0.96, y=-0.04, fontsize=8, extra_text=footer_text)
+
+        elif plot_type == "Hafta Tablosu":
+            fig, ax = plt.subplots(figsize=(14, 0.6 * len(round_summary) + 3))
+
+            sns.heatmap(
+                round_summary,
+                annot=True,
+                fmt=".1f",
+                cmap="Reds",
+                vmin=0,
+                vmax=100,
+                cbar=False,
+                linewidths=0.5,
+                ax=ax
+            )
+
+            ax.set_xlabel("")
+            ax.set_ylabel("")
+            ax.xaxis.tick_top()
+            ax.set_xticklabels(ax.get_xticklabels(), rotation=0)
+            ax.set_yticklabels(ax.get_yticklabels(), rotation=0)
+
+            ax.set_title(
+                f"{league} {season} Sezonu {max_round_next_day}. Hafta Maç Sonu Olasılıkları (%)",
+                fontsize=16,
+                fontweight="bold",
+                pad=40
+            )
+
+            add_footer(fig, x=0.98, y=-0.05, fontsize=8, extra_text=footer_text)
+            plt.tight_layout()
 
     elif selected_model == "Bradley-Terry":
         fig, ax = plt.subplots(figsize=(12, 10))
 
-        colors = ["red" if team == home_team else "blue" if team == away_team else "gray" for team in model_df["Team"]]
+        home_names = [home_team, get_venue_rating_name(home_team, "home")]
+        away_names = [away_team, get_venue_rating_name(away_team, "away")]
+        colors = ["red" if team in home_names else "blue" if team in away_names else "gray" for team in model_df["Team"]]
         ax.barh(
             model_df["Team"],
             model_df["Rating"],
@@ -250,14 +290,14 @@ def create_predictive_analytics_plot(
         )
 
         fig.suptitle(
-            f"{league} {season} Sezonu {max_round_next_day}. Hafta\nTakımların Güç Sıralaması ve Ev Sahibi Kazanma Olasılığı",
+            f"{league} {season} Sezonu {max_round_next_day}. Hafta\nTakımların Güç Sıralaması ve Maç Sonu Olasılıkları",
             fontsize=18,
             fontweight="bold",
             y=1.00
         )
 
         ax.set_title(
-            f"{home_team} - {away_team} Maçında Ev Sahibinin Kazanma Olasılığı: %{bt_prob * 100:.1f}",
+            f"{home_team} Galibiyeti: %{bt_prob[0] * 100:.1f} | Beraberlik: %{bt_prob[1] * 100:.1f} | {away_team} Galibiyeti: %{bt_prob[2] * 100:.1f}",
             fontsize=14,
             fontweight="bold",
             pad=20
@@ -267,14 +307,33 @@ def create_predictive_analytics_plot(
         ax.grid(axis="x", linestyle="--", alpha=0.7)
 
         ax.invert_yaxis()
-        add_footer(fig, x=0.98, y=-0.05, fontsize=8, extra_text=f"{selected_model} sonuçlarıdır.\nGeçmiş {last_round} haftanın verileri kullanılmıştır.")
+        add_footer(fig, x=0.98, y=-0.05, fontsize=8, extra_text=footer_text)
         plt.tight_layout()
 
     file_name = f"{league_display}_{season_display}_{max_round_next_day}_{turkish_english_lower(home_team)}_{turkish_english_lower(away_team)}_{turkish_english_lower(selected_model)}_mac_sonu_olasiliklari.png"
     st.markdown(add_download_button(fig, file_name=file_name), unsafe_allow_html=True)
     st.pyplot(fig)
 
-def main(league, season, league_display, season_display, selected_model, selected_game, max_round_next_day, plot_type, first_n_goals):
+def prepare_match_results(match_data_df):
+    match_data_df = match_data_df.rename(columns={
+        "home_score_display":"home_team_goals",
+        "away_score_display":"away_team_goals"
+    })
+    match_data_df["home_team_goals"] = pd.to_numeric(match_data_df["home_team_goals"], errors="coerce")
+    match_data_df["away_team_goals"] = pd.to_numeric(match_data_df["away_team_goals"], errors="coerce")
+    match_data_df = match_data_df[["week", "game_id", "start_timestamp", "home_team", "home_team_goals", "away_team", "away_team_goals", "status"]]
+    return match_data_df[match_data_df["status"] == "Ended"]
+
+def get_dixon_coles_artifact_name(xi):
+    return "dixon_coles" if not xi else f"dixon_coles_xi_{xi:g}"
+
+def get_game_teams(game):
+    return game.split("-")[0].strip(), game.split("-")[1].strip()
+
+def get_model_teams(match_data_df):
+    return np.sort(list(set(match_data_df["home_team"].unique()) | set(match_data_df["away_team"].unique())))
+
+def main(league, season, league_display, season_display, selected_model, selected_game, max_round_next_day, plot_type, first_n_goals, xi=0.0, round_games=None, split_venues=False):
 
     try:
 
@@ -282,31 +341,39 @@ def main(league, season, league_display, season_display, selected_model, selecte
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        match_data_df = match_data_df.rename(columns={
-            "home_score_display":"home_team_goals",
-            "away_score_display":"away_team_goals"
-        })
-        match_data_df["home_team_goals"] = pd.to_numeric(match_data_df["home_team_goals"], errors="coerce")
-        match_data_df["away_team_goals"] = pd.to_numeric(match_data_df["away_team_goals"], errors="coerce")
-        match_data_df = match_data_df[["week", "game_id", "home_team", "home_team_goals", "away_team", "away_team_goals", "status"]]
-        match_data_df = match_data_df[match_data_df["status"] == "Ended"]
+        match_data_df = prepare_match_results(load_filtered_json_files(directories, country_display, league_display, season_display, "match_data"))
+        dataset_version = get_dataset_version(directories, country_display, league_display, season_display, kinds=("match_data",))
+        fit_directory = get_model_fit_directory(directories, country_display, league_display, season_display)
 
-        home_team = selected_game.split("-")[0].strip()
-        away_team = selected_game.split("-")[1].strip()
+        home_team, away_team = get_game_teams(selected_game)
 
         if selected_model == "Dixon-Coles":
-            params = solve_parameters_cached(match_data_df)
-            model_df = dixon_coles_simulate_match_cached(params, home_team, away_team, max_goals=10)
+            params = read_season_artifact(directories, country_display, league_display, season_display, get_dixon_coles_artifact_name(xi))
+            if params is None:
+                params = solve_parameters_cached(dataset_version, match_data_df, xi, fit_directory)
+            round_games = list(round_games or [])
+            if selected_game not in round_games:
+                round_games.append(selected_game)
+            home_teams, away_teams = zip(*[get_game_teams(game) for game in round_games])
+            score_matrices, round_summary = dixon_coles_predict_round_cached(params, home_teams, away_teams, max_goals=10)
+            model_df = score_matrices[round_games.index(selected_game)]
+            if np.isnan(model_df).any():
+                raise KeyError(selected_game)
             bt_prob = None
         elif selected_model == "Bradley-Terry":
-            teams = np.sort(list(set(match_data_df["home_team"].unique()) | set(match_data_df["away_team"].unique())))
-            bt_ratings, team_indices = solve_bt_ratings_cached(match_data_df, teams)
+            bt_fit = None if split_venues else read_season_artifact(directories, country_display, league_display, season_display, "bradley_terry")
+            if bt_fit is None:
+                bt_ratings, team_indices = solve_bt_ratings_cached(dataset_version, match_data_df, get_model_teams(match_data_df), fit_directory, split_venues)
+            else:
+                bt_ratings, team_indices = bt_fit["ratings"], bt_fit["team_indices"]
+            round_summary = None
             bt_prob = bt_forecast_match_cached(bt_ratings, home_team, away_team, team_indices)
+            # The draw parameter is not a rating, so it is left out of the chart.
             model_df = pd.DataFrame({
                 "Team": list(team_indices.keys()),
                 "Rating": bt_ratings
-            }).sort_values("Rating", ascending=False)
+            })
+            model_df = model_df[model_df["Team"] != "draw"].sort_values("Rating", ascending=False)
             model_df["Team"] = model_df["Team"].replace("home_field_advantage", "Ev Sahibi Avantajı")
 
         last_round = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]["week"].max()
@@ -325,7 +392,9 @@ def main(league, season, league_display, season_display, selected_model, selecte
             plot_type,
             first_n_goals,
             bt_prob,
-            params if selected_model == "Dixon-Coles" and plot_type == "Takım Gücü" else None
+            params if selected_model == "Dixon-Coles" and plot_type == "Takım Gücü" else None,
+            xi if selected_model == "Dixon-Coles" else 0.0,
+            round_summary
         )
 
     except Exception as e:
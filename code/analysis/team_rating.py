@@ -1,7 +1,8 @@
 import os
 import streamlit as st
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_english_lower
+from code.utils.helpers import add_download_button, load_match_dimension, load_player_match_matrix, add_footer, turkish_english_lower
+from code.utils.player_match_matrix import get_stat_rows
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import matplotlib.pyplot as plt
 
@@ -65,20 +66,10 @@ def main(subcategory, league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        lineups_data = load_filtered_json_files(directories, country_display, league_display, season_display, "lineups_data")
-        lineups_data = lineups_data[lineups_data["stat_name"] == "rating"]
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-
-        lineups_games_data = lineups_data.merge(
-            match_data_df,
-            on=["tournament","season","week","game_id"],
-            how="right"
-        )
-
-        lineups_games_data["team_name"] = lineups_games_data.apply(
-            lambda row: row["home_team"] if row["team"] == "home" else row["away_team"], axis=1
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        lineups_games_data = get_stat_rows(
+            load_player_match_matrix(directories, country_display, league_display, season_display),
+            "rating"
         )
 
         last_round = match_data_df["week"].max()
@@ -1,8 +1,10 @@
 import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 from config import match_performance_translations, game_stats_group_name_translations
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_english_lower
+from code.utils.helpers import add_download_button, load_match_stats_cube, add_footer, turkish_english_lower, replace_labels
+from code.utils.match_stats import get_cube_field, reduce_by_team
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import StandardScaler
@@ -13,22 +15,7 @@ import matplotlib.pyplot as plt
 
 plt.style.use(PLOT_STYLE)
 
-def clean_percent_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                dataframe.at[index, col] = row[col].replace("%", "").strip()
-    return dataframe
-
-def clean_parenthesis_columns(dataframe, columns_to_check, target_columns):
-    for index, row in dataframe.iterrows():
-        if any(keyword in row["stat_name"] for keyword in columns_to_check):
-            for col in target_columns:
-                if "(" in row[col]:
-                    dataframe.at[index, col] = row[col].split("(")[0].strip()
-    return dataframe
-
-def process_exceptions(dataframe, exc_list):
+def build_team_stats(cube, stats_df):
     exception_handling = {
         "Topa Sahip Olma": "average",
         "Kazanılan Müdahaleler": "average",
@@ -41,46 +28,29 @@ def process_exceptions(dataframe, exc_list):
         "Çalımlar": "split_and_average",
     }
 
-    processed_df_list = []
+    values = get_cube_field(cube, "ALL", "value")
+    value_sums = reduce_by_team(cube, values)
+    value_means = reduce_by_team(cube, values, "mean")
+    ratio_means = reduce_by_team(cube, get_cube_field(cube, "ALL", "ratio"), "mean")
+    total_sums = reduce_by_team(cube, get_cube_field(cube, "ALL", "total"))
 
-    for stat_name, handling_type in exception_handling.items():
-        stat_df = dataframe[dataframe["stat_name"] == stat_name].copy()
+    team_stats = {}
+
+    for stat_code, stat_name in zip(stats_df["stat_code"], stats_df["stat_name"]):
+        handling_type = exception_handling.get(stat_name)
 
         if handling_type == "average":
-            stat_df = stat_df.groupby("team_name", as_index=False).agg({"stat_value": "mean"})
-            stat_df["stat_name"] = stat_name
-            processed_df_list.append(stat_df)
+            team_stats[stat_name] = value_means[:, stat_code]
 
         elif handling_type == "split_and_average":
-            success_rate = []
-            total_values = []
-
-            for value in stat_df["stat_value"]:
-                if isinstance(value, str) and "/" in value:
-                    try:
-                        success, total = map(int, value.split("/"))
-                        success_rate.append(success / total * 100)
-                        total_values.append(total)
-                    except ValueError:
-                        success_rate.append(None)
-                        total_values.append(None)
-                else:
-                    success_rate.append(None)
-                    total_values.append(None)
-
-            stat_df["stat_value_success"] = success_rate
-            stat_df["stat_value_total"] = total_values
-
-            success_avg_df = stat_df.groupby("team_name", as_index=False).agg({"stat_value_success": "mean"})
-            success_avg_df["stat_name"] = f"{stat_name}-Başarı"
+            team_stats[f"{stat_name}-Başarı"] = ratio_means[:, stat_code]
+            team_stats[f"{stat_name}-Toplam"] = total_sums[:, stat_code]
 
-            total_sum_df = stat_df.groupby("team_name", as_index=False).agg({"stat_value_total": "sum"})
-            total_sum_df["stat_name"] = f"{stat_name}-Toplam"
+        else:
+            team_stats[stat_name] = team_stats.get(stat_name, 0) + value_sums[:, stat_code]
 
-            processed_df_list.append(success_avg_df.rename(columns={"stat_value_success": "stat_value"}))
-            processed_df_list.append(total_sum_df.rename(columns={"stat_value_total": "stat_value"}))
-
-    return pd.concat(processed_df_list, ignore_index=True)
+    team_stats_df = pd.DataFrame(team_stats, index=pd.Index(cube["teams"], name="team_name"))
+    return team_stats_df.sort_index(axis=1).rename_axis(columns="stat_name").fillna(0)
 
 def update_game_stats_categories(match_stats_data_df):
     CATEGORY_MAPPINGS = {
@@ -218,90 +188,20 @@ def main(league, season, league_display, season_display, team, selected_categori
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_stats_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_stats_data")
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-
-        match_stats_data_df["stat_name"] = match_stats_data_df["stat_name"].replace(match_performance_translations)
-        match_stats_data_df["group_name"] = match_stats_data_df["group_name"].replace(game_stats_group_name_translations)
-        match_stats_data_df = update_game_stats_categories(match_stats_data_df)
-
-        match_data_df = match_data_df[["game_id", "home_team", "away_team"]]
-
-        match_stats_data_df = match_stats_data_df[match_stats_data_df["period"] == "ALL"]
-        match_stats_data_df = match_stats_data_df.rename(
-            columns={"home_team": "home_team_stat", "away_team": "away_team_stat"}
-        )
-
-        percent_keywords = ["Topa Sahip Olma", "Kazanılan Müdahaleler", "İkili Mücadeleler"]
-        parenthesis_keywords = [
-            "Üçüncü Bölge Aşaması",
-            "Uzun Paslar",
-            "Ortalar",
-            "Yer Mücadeleleri",
-            "Hava Topu Mücadeleleri",
-            "Çalımlar",
-        ]
-        target_columns = ["home_team_stat", "away_team_stat"]
-
-        exc_list = [
-            "Topa Sahip Olma",
-            "Kazanılan Müdahaleler",
-            "İkili Mücadeleler",
-            "Üçüncü Bölge Aşaması",
-            "Uzun Paslar",
-            "Ortalar",
-            "Yer Mücadeleleri",
-            "Hava Topu Mücadeleleri",
-            "Çalımlar",
-        ]
-
-        match_stats_data_df = clean_percent_columns(match_stats_data_df, percent_keywords, target_columns)
-        match_stats_data_df = clean_parenthesis_columns(match_stats_data_df, parenthesis_keywords, target_columns)
-
-        match_stats_data_df.loc[
-            ~match_stats_data_df["home_team_stat"].str.contains("/", na=False), "home_team_stat"
-        ] = pd.to_numeric(match_stats_data_df["home_team_stat"], errors="coerce")
-
-        match_stats_data_df.loc[
-            ~match_stats_data_df["away_team_stat"].str.contains("/", na=False), "away_team_stat"
-        ] = pd.to_numeric(match_stats_data_df["away_team_stat"], errors="coerce")
-
-        master_df = match_stats_data_df.merge(match_data_df, on="game_id")
-
-        all_stats_df_list = []
-
-        for stat in master_df["stat_name"].unique():
-            stat_df = master_df[master_df["stat_name"] == stat]
-            temp_df = pd.DataFrame(
-                {
-                    "team_name": pd.concat([stat_df["home_team"], stat_df["away_team"]]),
-                    "stat_name": [stat] * len(stat_df) * 2,
-                    "group_name": pd.concat([stat_df["group_name"], stat_df["group_name"]]),
-                    "stat_value": pd.concat([stat_df["home_team_stat"], stat_df["away_team_stat"]]),
-                }
-            )
-            all_stats_df_list.append(temp_df)
-
-        result_all_stats_df = pd.concat(all_stats_df_list, ignore_index=True)
-        result_all_stats_df = result_all_stats_df.reset_index(drop=True)
-
-        filtered_result_selected_stats_df = result_all_stats_df[
-            (result_all_stats_df["group_name"].isin(selected_categories))
-        ]
-
-        exc_processed_df = process_exceptions(filtered_result_selected_stats_df, exc_list)
-
-        remaining_stats_df = filtered_result_selected_stats_df[
-            ~filtered_result_selected_stats_df["stat_name"].isin(exc_list)
-        ]
+        cube = load_match_stats_cube(directories, country_display, league_display, season_display)
 
-        aggregated_df = remaining_stats_df.groupby(["team_name", "stat_name"], as_index=False)["stat_value"].sum()
+        stats_df = pd.DataFrame({
+            "stat_code": np.arange(len(cube["stat_names"])),
+            "group_name": cube["group_names"],
+            "stat_name": cube["stat_names"]
+        })
+        stats_df["stat_name"] = replace_labels(stats_df["stat_name"], match_performance_translations)
+        stats_df["group_name"] = replace_labels(stats_df["group_name"], game_stats_group_name_translations)
+        stats_df = update_game_stats_categories(stats_df)
 
-        final_df = pd.concat([exc_processed_df, aggregated_df], ignore_index=True)
+        stats_df = stats_df[stats_df["group_name"].isin(selected_categories)]
 
-        pivot_df = final_df.pivot(index="team_name", columns="stat_name", values="stat_value").fillna(0)
+        pivot_df = build_team_stats(cube, stats_df)
 
         if similarity_algorithm == "Kosinüs Benzerliği":
             scaler = StandardScaler()
@@ -336,7 +236,7 @@ def main(league, season, league_display, season_display, team, selected_categori
             top_features_pc1 = top_loadings["PC1"].nlargest(5).index.tolist()
             top_features_pc2 = top_loadings["PC2"].nlargest(5).index.tolist()
 
-        last_round = master_df["week"].max()
+        last_round = cube["weeks"].max()
 
         create_team_similarity_plot(
             similarity_df,
@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 import streamlit as st
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_upper, sort_turkish
+from code.utils.helpers import add_download_button, load_scorelines, add_footer, turkish_upper, sort_turkish
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 from matplotlib.ticker import MultipleLocator
 import matplotlib.ticker as ticker
@@ -95,35 +95,11 @@ def main(league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-        match_data_df = match_data_df[["tournament", "season", "week", "game_id", "home_team", "away_team"]]
-
-        shots_data_df = shots_data_df.merge(
-            match_data_df,
-            on=["tournament", "season", "week", "game_id"],
-            how="left"
-        )
-        shots_data_df["team_name"] = shots_data_df.apply(
-            lambda row: row["home_team"] if row["is_home"] else row["away_team"], axis=1
-        )
-        shots_data_df["is_goal"] = shots_data_df["shot_type"].apply(lambda x: 1 if x == "goal" else 0)
-        shot_maps_data_goal = shots_data_df[shots_data_df['is_goal'] == 1]
-        shot_maps_data_goal = shot_maps_data_goal[["tournament", "season", "week", "game_id", "team_name"]]
-
-        match_data_df["home_score"] = 0
-        match_data_df["away_score"] = 0
+        match_data_df = load_scorelines(directories, country_display, league_display, season_display)
+        match_data_df = match_data_df[["tournament", "season", "week", "game_id", "home_team", "away_team", "home_score", "away_score"]]
 
         match_data_df = match_data_df.sort_values(by=["week"], ascending=[True])
 
-        for i, row in match_data_df.iterrows():
-            home_team_shots = len(shot_maps_data_goal[(shot_maps_data_goal["game_id"] == row["game_id"]) & (shot_maps_data_goal["team_name"] == row["home_team"])])
-            away_team_shots = len(shot_maps_data_goal[(shot_maps_data_goal["game_id"] == row["game_id"]) & (shot_maps_data_goal["team_name"] == row["away_team"])])
-            match_data_df.at[i, "home_score"] = home_team_shots
-            match_data_df.at[i, "away_score"] = away_team_shots
-
         team_stats = {}
         time_series_data_with_location = []
 
@@ -1,6 +1,6 @@
 import os
 import streamlit as st
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer
+from code.utils.helpers import add_download_button, load_many, add_footer
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import matplotlib.pyplot as plt
@@ -55,17 +55,17 @@ def main(league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
-        standings_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "standings_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
+        match_data_df, shots_data_df, standings_data_df = load_many(
+            directories, country_display, league_display, season_display,
+            [
+                {"table": "match_dimension"},
+                {"table": "shots_enriched"},
+                {"kind": "standings_data"}
+            ]
+        )
 
         standings_data_df = standings_data_df[standings_data_df["category"] == "Total"][["team_name", "scores_for", "scores_against"]]
 
-        shots_data_df = shots_data_df.merge(match_data_df, on=["tournament", "season", "week", "game_id"])
-        shots_data_df["team_name"] = shots_data_df.apply(lambda x: x["home_team"] if x["is_home"] else x["away_team"], axis=1)
-
         xg_xga_df = shots_data_df.groupby(["game_id","team_name"])["xg"].sum().reset_index()
 
         for game_id in xg_xga_df["game_id"].unique():
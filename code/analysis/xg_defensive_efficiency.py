@@ -1,6 +1,6 @@
 import os
 import streamlit as st
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer
+from code.utils.helpers import add_download_button, load_match_dimension, load_shots_enriched, add_footer
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 import matplotlib.pyplot as plt
@@ -62,15 +62,10 @@ def main(league, season, league_display, season_display):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        shots_data_df = load_shots_enriched(directories, country_display, league_display, season_display)
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-
-        shots_data_df = shots_data_df.merge(match_data_df, on=["tournament", "season", "week", "game_id"])
-        shots_data_df["team_name"] = shots_data_df.apply(lambda x: x["home_team"] if x["is_home"] else x["away_team"], axis=1)
         shots_data_df = shots_data_df[shots_data_df["goal_type"] != "penalty"]
-        shots_data_df["is_goal"] = shots_data_df["shot_type"].apply(lambda x: 1 if x == "goal" else 0)
 
         xg_xga_df = shots_data_df.groupby(["game_id", "team_name"]).agg(
             xg=("xg", "sum"),
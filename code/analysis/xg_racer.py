@@ -2,7 +2,7 @@ import os
 import pandas as pd
 import numpy as np
 import streamlit as st
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_upper, turkish_english_lower
+from code.utils.helpers import add_download_button, load_dataset, load_match_dimension, enrich_shots, add_footer, turkish_upper, turkish_english_lower
 from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 from adjustText import adjust_text
 import matplotlib.pyplot as plt
@@ -358,8 +358,7 @@ def main(league, season, league_display, season_display, selected_round, home_te
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
 
         filtered_games = match_data_df[
             (match_data_df["week"] == selected_round) &
@@ -367,18 +366,14 @@ def main(league, season, league_display, season_display, selected_round, home_te
             (match_data_df["away_team"] == away_team)
         ]
 
-        shots_data_df = shots_data_df.merge(
-            filtered_games,
-            on=["tournament","season","week","game_id"]
+        shots_data_df = load_dataset(
+            directories, country_display, league_display, season_display, "shots_data",
+            filters={"game_id": tuple(filtered_games["game_id"].tolist())}
         )
-        shots_data_df["team_name"] = shots_data_df.apply(
-            lambda x: x["home_team"] if x["is_home"] else x["away_team"], axis=1
-        )
-        shots_data_df["period"] = shots_data_df["time"].apply(lambda x: "First Half" if x <= 45 else "Second Half")
+
+        shots_data_df = enrich_shots(shots_data_df, filtered_games)
         shots_data_df["injury_time_1"] = shots_data_df["injury_time_1"].fillna(0)
         shots_data_df["injury_time_2"] = shots_data_df["injury_time_2"].fillna(0)
-        shots_data_df["added_time"] = shots_data_df["added_time"].fillna(0)
-        shots_data_df["net_time"] = shots_data_df["time"] + shots_data_df["added_time"]
 
         create_xg_racer_plot(filtered_games, shots_data_df, league, season, league_display, season_display, home_team, away_team, selected_round)
 
@@ -1,8 +1,8 @@
 import os
 import numpy as np
 import streamlit as st
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_english_lower
-from config import change_situations, change_body_parts, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
+from code.utils.helpers import add_download_button, load_match_dimension, load_shots_enriched, add_footer, turkish_english_lower
+from config import PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
 import matplotlib.pyplot as plt
 
 plt.style.use(PLOT_STYLE)
@@ -77,16 +77,9 @@ def main(league, season, league_display, season_display, situation_type=None, bo
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
+        shots_data_df = load_shots_enriched(directories, country_display, league_display, season_display)
 
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
-
-        shots_data_df = shots_data_df.merge(match_data_df, on=["tournament", "season", "week", "game_id"])
-        shots_data_df["team_name"] = shots_data_df.apply(lambda x: x["home_team"] if x["is_home"] else x["away_team"], axis=1)
-
-        shots_data_df["situation"] = shots_data_df["situation"].replace(change_situations)
-        shots_data_df["body_part"] = shots_data_df["body_part"].replace(change_body_parts)
 
         if category == "situation" and situation_type is not None:
             filtered_data = shots_data_df[shots_data_df["situation"] == situation_type]
@@ -98,10 +91,10 @@ def main(league, season, league_display, season_display, situation_type=None, bo
             filtered_data = shots_data_df
             grouping_columns = ["game_id", "team_name"]
 
-        xg_xga_df = filtered_data.groupby(grouping_columns)["xg"].sum().reset_index()
+        xg_xga_df = filtered_data.groupby(grouping_columns, observed=True)["xg"].sum().reset_index()
 
         goals_data = filtered_data[filtered_data["shot_type"] == "goal"]
-        goals_df = goals_data.groupby(grouping_columns)["shot_type"].count().reset_index()
+        goals_df = goals_data.groupby(grouping_columns, observed=True)["shot_type"].count().reset_index()
         goals_df = goals_df.rename(columns={"shot_type": "goals"})
 
         xg_xga_df = xg_xga_df.merge(goals_df, on=grouping_columns, how="left")
@@ -132,7 +125,7 @@ def main(league, season, league_display, season_display, situation_type=None, bo
                             xg_xga_df.at[index, "conceded_goals"] = 0
 
         grouping_columns_without_game_id = [col for col in grouping_columns if col != "game_id"]
-        team_totals_df = xg_xga_df.groupby(grouping_columns_without_game_id)[["xg", "xga", "goals", "conceded_goals"]].sum().reset_index()
+        team_totals_df = xg_xga_df.groupby(grouping_columns_without_game_id, observed=True)[["xg", "xga", "goals", "conceded_goals"]].sum().reset_index()
 
         team_totals_df["xgDiff"] = team_totals_df["goals"] - team_totals_df["xg"]
         team_totals_df["xgaDiff"] = team_totals_df["conceded_goals"] - team_totals_df["xga"]
@@ -2,7 +2,7 @@ import os
 import pandas as pd
 import streamlit as st
 from config import team_list_by_season, PLOT_STYLE, LEAGUE_COUNTRY_LOOKUP
-from code.utils.helpers import add_download_button, load_filtered_json_files, add_footer, turkish_english_lower
+from code.utils.helpers import add_download_button, load_many, add_footer, turkish_english_lower
 import matplotlib.patches as mpatches
 import matplotlib.ticker as ticker
 from matplotlib.ticker import MultipleLocator
@@ -148,18 +148,18 @@ def main(league, season, league_display, season_display, plot_type):
 
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
 
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        shots_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "shots_data")
-        standings_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "standings_data")
-
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
+        match_data_df, shots_data_df, standings_data_df = load_many(
+            directories, country_display, league_display, season_display,
+            [
+                {"table": "match_dimension"},
+                {"table": "shots_enriched"},
+                {"kind": "standings_data"}
+            ]
+        )
 
         standings_data_df = standings_data_df[standings_data_df["category"] == "Total"][["team_name", "scores_for", "scores_against"]]
 
-        shots_data_df = shots_data_df.merge(match_data_df, on=["tournament", "season", "week", "game_id"])
-        shots_data_df["team_name"] = shots_data_df.apply(lambda x: x["home_team"] if x["is_home"] else x["away_team"], axis=1)
-
-        xg_by_team = shots_data_df.groupby(["team_name", "week"])["xg"].sum().reset_index(name="total_xg")
+        xg_by_team = shots_data_df.groupby(["team_name", "week"], observed=True)["xg"].sum().reset_index(name="total_xg")
         xg_by_team_pivot = xg_by_team.pivot(index="team_name", columns="week", values="total_xg").fillna(0)
         xg_by_team_long = xg_by_team_pivot.reset_index().melt(id_vars="team_name", var_name="week", value_name="total_xg")
 
@@ -171,7 +171,7 @@ def main(league, season, league_display, season_display, plot_type):
                 on=["game_id", "week"]
             )
             .query("team_type.str.replace('_team', '') == goal_type.str.replace('_score_display', '')")
-            .groupby(["team", "week"], as_index=False)["goals"].sum()
+            .groupby(["team", "week"], as_index=False, observed=True)["goals"].sum()
             .rename(columns={
                 "team": "team_name",
                 "goals": "week_goal_count"
@@ -181,8 +181,8 @@ def main(league, season, league_display, season_display, plot_type):
 
         xg_goal_teams = pd.merge(xg_by_team_long, goal_shots_by_team_long, on=["team_name", "week"])
         xg_goal_teams = xg_goal_teams.sort_values(by=["team_name", "week"])
-        xg_goal_teams["cumulative_total_xg"] = xg_goal_teams.groupby("team_name")["total_xg"].cumsum()
-        xg_goal_teams["cumulative_goal_count"] = xg_goal_teams.groupby("team_name")["week_goal_count"].cumsum()
+        xg_goal_teams["cumulative_total_xg"] = xg_goal_teams.groupby("team_name", observed=True)["total_xg"].cumsum()
+        xg_goal_teams["cumulative_goal_count"] = xg_goal_teams.groupby("team_name", observed=True)["week_goal_count"].cumsum()
         xg_goal_teams["cum_goal_xg_diff"] = xg_goal_teams["cumulative_goal_count"] - xg_goal_teams["cumulative_total_xg"]
 
         xg_goal_teams["cumulative_goal_count"] = pd.to_numeric(xg_goal_teams["cumulative_goal_count"], errors="coerce")
@@ -1,47 +1,102 @@
 import streamlit as st
 import numpy as np
 from scipy.optimize import minimize
+from code.utils.model_fits import load_or_fit
 
-def bt_home_forecast(home_rating, away_rating, home_field_advantage):
-    return 1 / (1 + np.exp(-(home_field_advantage + home_rating - away_rating)))
+VENUE_LABELS = {"home": "İç Saha", "away": "Deplasman"}
 
-def bt_log_likelihood(bt_ratings, dataset, team_indices):
-    log_likelihood = 0
-    for _, row in dataset.iterrows():
-        home = row["home_team"]
-        visitor = row["away_team"]
-        h_win = row["home_team_goals"] > row["away_team_goals"]
+def get_venue_rating_name(team, venue):
+    return f"{team} ({VENUE_LABELS[venue]})"
 
-        home_rating = bt_ratings[team_indices[home]]
-        away_rating = bt_ratings[team_indices[visitor]]
-        home_field_advantage = bt_ratings[team_indices["home_field_advantage"]]
+def get_team_indices(teams, split_venues=False):
+    # With split venues every team has a home and an away rating, which absorb the home advantage.
+    if split_venues:
+        names = [get_venue_rating_name(team, "home") for team in teams] + [get_venue_rating_name(team, "away") for team in teams]
+    else:
+        names = list(teams) + ["home_field_advantage"]
+    team_indices = {name: i for i, name in enumerate(names)}
+    team_indices["draw"] = len(names)
+    return team_indices
 
-        forecast = bt_home_forecast(home_rating, away_rating, home_field_advantage)
-        result = forecast if h_win else (1 - forecast)
+def get_rating_codes(team_indices, home_teams, away_teams):
+    if "home_field_advantage" in team_indices:
+        home_names, away_names = home_teams, away_teams
+    else:
+        home_names = [get_venue_rating_name(team, "home") for team in home_teams]
+        away_names = [get_venue_rating_name(team, "away") for team in away_teams]
+    home_codes = np.array([team_indices[name] for name in home_names], dtype="int32")
+    away_codes = np.array([team_indices[name] for name in away_names], dtype="int32")
+    return home_codes, away_codes
 
-        log_likelihood += np.log(max(result, 1e-10))
-    return -log_likelihood
+def get_strengths(bt_ratings, team_indices, home_codes, away_codes):
+    home_strength = bt_ratings[home_codes]
+    if "home_field_advantage" in team_indices:
+        home_strength = home_strength + bt_ratings[team_indices["home_field_advantage"]]
+    away_strength = bt_ratings[away_codes]
+    # Davidson: a draw scores nu * sqrt(pi_home * pi_away), with log(nu) as the "draw" parameter.
+    draw_strength = bt_ratings[team_indices["draw"]] + (home_strength + away_strength) / 2
+    return home_strength, draw_strength, away_strength
 
-@st.cache_data(show_spinner=False)
-def solve_bt_ratings_cached(dataset, teams):
-    n_teams = len(teams)
-    initial_ratings = np.ones(n_teams + 1)
-    team_indices = {team: i for i, team in enumerate(teams)}
-    team_indices["home_field_advantage"] = n_teams
+def bt_outcome_probabilities(home_strength, draw_strength, away_strength):
+    log_norm = np.logaddexp(np.logaddexp(home_strength, away_strength), draw_strength)
+    return np.exp(home_strength - log_norm), np.exp(draw_strength - log_norm), np.exp(away_strength - log_norm)
+
+def bt_log_likelihood(bt_ratings, home_codes, away_codes, outcomes, team_indices):
+    # Negative log-likelihood of every match at once and its exact gradient; outcomes are 1, 0, -1 for home win, draw, away win.
+    home_strength, draw_strength, away_strength = get_strengths(bt_ratings, team_indices, home_codes, away_codes)
+    log_norm = np.logaddexp(np.logaddexp(home_strength, away_strength), draw_strength)
+    p_home, p_draw, p_away = np.exp(home_strength - log_norm), np.exp(draw_strength - log_norm), np.exp(away_strength - log_norm)
+    is_home, is_draw, is_away = outcomes == 1, outcomes == 0, outcomes == -1
+
+    log_likelihood = np.sum(np.where(is_home, home_strength, np.where(is_away, away_strength, draw_strength)) - log_norm)
+
+    grad_home = is_home + is_draw / 2 - (p_home + p_draw / 2)
+    grad_away = is_away + is_draw / 2 - (p_away + p_draw / 2)
+    grad = np.bincount(home_codes, grad_home, len(bt_ratings)) + np.bincount(away_codes, grad_away, len(bt_ratings))
+    if "home_field_advantage" in team_indices:
+        grad[team_indices["home_field_advantage"]] = np.sum(grad_home)
+    grad[team_indices["draw"]] = np.sum(is_draw - p_draw)
+    return -log_likelihood, -grad
+
+def solve_bt_ratings(dataset, teams, warm_start=None, split_venues=False):
+    team_indices = get_team_indices(teams, split_venues)
+    initial_ratings = np.ones(len(team_indices))
+    initial_ratings[team_indices["draw"]] = 0.0
+    if warm_start is not None:
+        # A previous round's optimum; ratings it has not seen keep their usual start.
+        initial_ratings = np.array([warm_start.get(name, value) for name, value in zip(team_indices, initial_ratings)])
+
+    home_codes, away_codes = get_rating_codes(team_indices, dataset["home_team"], dataset["away_team"])
+    outcomes = np.sign(dataset["home_team_goals"].to_numpy(dtype="float64") - dataset["away_team_goals"].to_numpy(dtype="float64"))
 
     result = minimize(
         bt_log_likelihood,
         initial_ratings,
-        args=(dataset, team_indices),
+        args=(home_codes, away_codes, outcomes, team_indices),
+        jac=True,
         method="BFGS"
     )
 
     bt_ratings = result.x
     return bt_ratings, team_indices
 
+# Keyed on the dataset version token; the leading underscore keeps Streamlit from hashing the frame.
+@st.cache_data(show_spinner=False)
+def solve_bt_ratings_cached(dataset_version, _dataset, teams, fit_directory=None, split_venues=False):
+    if fit_directory is None:
+        return solve_bt_ratings(_dataset, teams, split_venues=split_venues)
+
+    def fit(warm_start):
+        bt_ratings, team_indices = solve_bt_ratings(_dataset, teams, warm_start, split_venues)
+        return {name: float(bt_ratings[i]) for name, i in team_indices.items()}
+
+    options = {"split_venues": 1} if split_venues else {}
+    params = load_or_fit(fit_directory, "bradley_terry", options, _dataset["week"].max(), dataset_version, fit)
+    team_indices = get_team_indices(teams, split_venues)
+    return np.array([params[name] for name in team_indices]), team_indices
+
 @st.cache_data(show_spinner=False)
 def bt_forecast_match_cached(bt_ratings, home_team, away_team, team_indices):
-    home_rating = bt_ratings[team_indices[home_team]]
-    away_rating = bt_ratings[team_indices[away_team]]
-    home_field_advantage = bt_ratings[team_indices["home_field_advantage"]]
-    return bt_home_forecast(home_rating, away_rating, home_field_advantage)
\ No newline at end of file
+    # Home win, draw and away win probabilities.
+    home_codes, away_codes = get_rating_codes(team_indices, [home_team], [away_team])
+    return np.concatenate(bt_outcome_probabilities(*get_strengths(bt_ratings, team_indices, home_codes, away_codes)))
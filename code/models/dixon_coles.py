@@ -1,107 +1,180 @@
 import streamlit as st
 import numpy as np
-from scipy.stats import poisson
+import pandas as pd
+from scipy.special import gammaln
 from scipy.optimize import minimize, Bounds
-
-def rho_correction(x, y, lambda_x, mu_y, rho):
-    if x == 0 and y == 0:
-        return max(1 - lambda_x * mu_y * rho, 1e-10)
-    elif x == 0 and y == 1:
-        return 1 + lambda_x * rho
-    elif x == 1 and y == 0:
-        return 1 + mu_y * rho
-    elif x == 1 and y == 1:
-        return max(1 - rho, 1e-10)
-    else:
-        return 1.0
-
-def dc_log_like(x, y, alpha_x, beta_x, alpha_y, beta_y, rho, gamma):
-    lambda_x = np.exp(alpha_x + beta_y + gamma)
-    mu_y = np.exp(alpha_y + beta_x)
-    log_lambda_x = np.log(max(poisson.pmf(x, lambda_x), 1e-10))
-    log_mu_y = np.log(max(poisson.pmf(y, mu_y), 1e-10))
-    return (
-        np.log(max(rho_correction(x, y, lambda_x, mu_y, rho), 1e-10)) + log_lambda_x + log_mu_y
-    )
-
-def solve_parameters(dataset, init_vals=None, options={"disp": True, "maxiter": 100}, **kwargs):
-    teams = np.sort(
-        list(
-            set(dataset["home_team"].unique()) | set(dataset["away_team"].unique())
-        )
-    )
+from code.utils.interning import build_name_index, intern_names
+from code.utils.model_fits import load_or_fit
+
+# Floor applied to every probability before its log, as in the scalar formulation.
+LOG_FLOOR = np.log(1e-10)
+
+def poisson_log_pmf(k, mu):
+    return k * np.log(mu) - mu - gammaln(k + 1)
+
+def tau_correction(x, y, lambda_x, mu_y, rho):
+    # Dixon-Coles low-score correction for arrays of scores, with the partial derivatives of tau for the gradient.
+    is_00 = (x == 0) & (y == 0)
+    is_01 = (x == 0) & (y == 1)
+    is_10 = (x == 1) & (y == 0)
+    is_11 = (x == 1) & (y == 1)
+
+    tau = np.ones_like(lambda_x)
+    tau[is_00] = 1 - lambda_x[is_00] * mu_y[is_00] * rho
+    tau[is_01] = 1 + lambda_x[is_01] * rho
+    tau[is_10] = 1 + mu_y[is_10] * rho
+    tau[is_11] = 1 - rho
+
+    # d tau / d log(lambda), d log(mu) and d rho.
+    d_lambda = np.zeros_like(lambda_x)
+    d_mu = np.zeros_like(lambda_x)
+    d_rho = np.zeros_like(lambda_x)
+    d_lambda[is_00] = d_mu[is_00] = -lambda_x[is_00] * mu_y[is_00] * rho
+    d_rho[is_00] = -lambda_x[is_00] * mu_y[is_00]
+    d_lambda[is_01] = lambda_x[is_01] * rho
+    d_rho[is_01] = lambda_x[is_01]
+    d_mu[is_10] = mu_y[is_10] * rho
+    d_rho[is_10] = mu_y[is_10]
+    d_rho[is_11] = -1.0
+    return tau, d_lambda, d_mu, d_rho
+
+def get_time_weights(start_timestamps, xi, reference_timestamp=None):
+    # Dixon-Coles exp(-xi * t) down-weighting, with t the days between a match and the reference
+    # (by default the latest match).
+    start_timestamps = np.asarray(start_timestamps, dtype="float64")
+    if reference_timestamp is None:
+        reference_timestamp = start_timestamps.max(initial=0)
+    return np.exp(-xi * np.maximum(reference_timestamp - start_timestamps, 0) / 86400)
+
+def dc_log_like(params, home_codes, away_codes, x, y, n_teams, weights):
+    # Weighted log-likelihood of every match at once and its exact gradient; floored terms contribute no slope.
+    attack, defence = params[:n_teams], params[n_teams:2 * n_teams]
+    rho, gamma = params[-2:]
+    lambda_x = np.exp(attack[home_codes] + defence[away_codes] + gamma)
+    mu_y = np.exp(attack[away_codes] + defence[home_codes])
+
+    log_pmf_x = poisson_log_pmf(x, lambda_x)
+    log_pmf_y = poisson_log_pmf(y, mu_y)
+    tau, d_lambda, d_mu, d_rho = tau_correction(x, y, lambda_x, mu_y, rho)
+    is_tau_live = tau > 1e-10
+    log_tau = np.where(is_tau_live, np.log(np.where(is_tau_live, tau, 1.0)), LOG_FLOOR)
+    log_like = np.sum(weights * (log_tau + np.maximum(log_pmf_x, LOG_FLOOR) + np.maximum(log_pmf_y, LOG_FLOOR)))
+
+    inverse_tau = np.where(is_tau_live, weights / np.where(is_tau_live, tau, 1.0), 0.0)
+    grad_lambda = weights * np.where(log_pmf_x > LOG_FLOOR, x - lambda_x, 0.0) + d_lambda * inverse_tau
+    grad_mu = weights * np.where(log_pmf_y > LOG_FLOOR, y - mu_y, 0.0) + d_mu * inverse_tau
+
+    grad = np.empty_like(params)
+    grad[:n_teams] = np.bincount(home_codes, grad_lambda, n_teams) + np.bincount(away_codes, grad_mu, n_teams)
+    grad[n_teams:2 * n_teams] = np.bincount(away_codes, grad_lambda, n_teams) + np.bincount(home_codes, grad_mu, n_teams)
+    grad[-2] = np.sum(d_rho * inverse_tau)
+    grad[-1] = np.sum(grad_lambda)
+    return log_like, grad
+
+def solve_parameters(dataset, init_vals=None, options={"disp": True, "maxiter": 100}, xi=0.0, reference_timestamp=None, warm_start=None, **kwargs):
+    teams = build_name_index(dataset["home_team"], dataset["away_team"])
     n_teams = len(teams)
+    names = ["attack_" + team for team in teams] + ["defence_" + team for team in teams] + ["rho", "home_adv"]
 
     if init_vals is None:
-        avg_attack = dataset.groupby("home_team")["home_team_goals"].mean().reindex(teams).fillna(1.0).values
-        avg_defence = -dataset.groupby("away_team")["away_team_goals"].mean().reindex(teams).fillna(1.0).values
+        avg_attack = dataset.groupby("home_team", observed=True)["home_team_goals"].mean().reindex(teams).fillna(1.0).values
+        avg_defence = -dataset.groupby("away_team", observed=True)["away_team_goals"].mean().reindex(teams).fillna(1.0).values
         init_vals = np.concatenate([
             avg_attack,
             avg_defence,
             np.array([0, 1.0])
         ])
+    if warm_start is not None:
+        # A previous round's optimum; teams it has not seen keep their group-mean start.
+        init_vals = np.array([warm_start.get(name, value) for name, value in zip(names, init_vals)])
+
+    home_codes = intern_names(dataset["home_team"], teams)
+    away_codes = intern_names(dataset["away_team"], teams)
+    x = dataset["home_team_goals"].to_numpy(dtype="float64")
+    y = dataset["away_team_goals"].to_numpy(dtype="float64")
+    if xi:
+        weights = get_time_weights(dataset["start_timestamp"], xi, reference_timestamp)
+    else:
+        weights = np.ones(len(dataset))
 
     def estimate_parameters(params):
-        attack_coeffs = dict(zip(teams, params[:n_teams]))
-        defence_coeffs = dict(zip(teams, params[n_teams:2 * n_teams]))
-        rho, gamma = params[-2:]
-
-        log_likelihoods = [
-            dc_log_like(
-                row.home_team_goals,
-                row.away_team_goals,
-                attack_coeffs[row.home_team],
-                defence_coeffs[row.home_team],
-                attack_coeffs[row.away_team],
-                defence_coeffs[row.away_team],
-                rho, gamma
-            )
-            for row in dataset.itertuples()
-        ]
-        return -np.sum(log_likelihoods)
-
-    constraints = [{"type": "eq", "fun": lambda x, n=n_teams: sum(x[:n]) - n}]
+        # Line-search trial points can overflow exp; they come back as inf and are rejected.
+        with np.errstate(over="ignore", invalid="ignore"):
+            log_like, grad = dc_log_like(params, home_codes, away_codes, x, y, n_teams, weights)
+        return -log_like, -grad
+
+    constraints = [{
+        "type": "eq",
+        "fun": lambda params, n=n_teams: sum(params[:n]) - n,
+        "jac": lambda params, n=n_teams: np.concatenate([np.ones(n), np.zeros(len(params) - n)])
+    }]
 
     bounds = Bounds(
         [-np.inf] * n_teams + [-np.inf] * n_teams + [-1, 0],
         [np.inf] * n_teams + [np.inf] * n_teams + [1, np.inf]
     )
 
-    opt_output = minimize(estimate_parameters, init_vals, options=options, constraints=constraints, bounds=bounds, **kwargs)
-
-    return dict(
-        zip(
-            ["attack_" + team for team in teams] +
-            ["defence_" + team for team in teams] +
-            ["rho", "home_adv"],
-            opt_output.x
-        )
-    )
+    opt_output = minimize(estimate_parameters, init_vals, jac=True, options=options, constraints=constraints, bounds=bounds, **kwargs)
+
+    return dict(zip(names, opt_output.x))
+
+def predict_score_matrices(params_dict, home_teams, away_teams, max_goals=10):
+    # Score probabilities of every fixture at once, shaped [n_games, max_goals + 1, max_goals + 1].
+    # A team without a fit (no finished games yet) gives its fixtures all-NaN matrices.
+    def get_params(prefix, teams):
+        return np.array([params_dict.get(prefix + team, np.nan) for team in teams], dtype="float64")
+
+    lambda_x = np.exp(get_params("attack_", home_teams) + get_params("defence_", away_teams) + params_dict["home_adv"])
+    mu_y = np.exp(get_params("defence_", home_teams) + get_params("attack_", away_teams))
+
+    goals = np.arange(max_goals + 1)
+    home_pmf = np.exp(poisson_log_pmf(goals, lambda_x[:, None]))
+    away_pmf = np.exp(poisson_log_pmf(goals, mu_y[:, None]))
+    score_matrices = home_pmf[:, :, None] * away_pmf[:, None, :]
+
+    rho = params_dict["rho"]
+    score_matrices[:, 0, 0] *= np.maximum(1 - lambda_x * mu_y * rho, 1e-10)
+    score_matrices[:, 0, 1] *= 1 + lambda_x * rho
+    score_matrices[:, 1, 0] *= 1 + mu_y * rho
+    score_matrices[:, 1, 1] *= max(1 - rho, 1e-10)
+    return score_matrices
+
+def summarize_score_matrices(score_matrices, games):
+    # Fixtures the fit cannot price are left out of the table.
+    is_priced = ~np.isnan(score_matrices).any(axis=(1, 2))
+    score_matrices, games = score_matrices[is_priced], np.asarray(games, dtype=object)[is_priced]
+    goals = np.arange(score_matrices.shape[1])
+    home_goals, away_goals = goals[:, None], goals[None, :]
+
+    def get_probability(mask):
+        return np.sum(score_matrices * mask, axis=(1, 2)) * 100
+
+    return pd.DataFrame({
+        "Ev Sahibi": get_probability(home_goals > away_goals),
+        "Beraberlik": get_probability(home_goals == away_goals),
+        "Deplasman": get_probability(home_goals < away_goals),
+        "1.5 Üst": get_probability(home_goals + away_goals > 1.5),
+        "2.5 Üst": get_probability(home_goals + away_goals > 2.5),
+        "3.5 Üst": get_probability(home_goals + away_goals > 3.5),
+        "Karşılıklı Gol Var": get_probability((home_goals > 0) & (away_goals > 0))
+    }, index=pd.Index(games, name="Maç"))
 
 def dixon_coles_simulate_match(params_dict, home_team, away_team, max_goals=10):
-    def calc_means(param_dict, home_team, away_team):
-        return [
-            np.exp(param_dict["attack_" + home_team] + param_dict["defence_" + away_team] + param_dict["home_adv"]),
-            np.exp(param_dict["defence_" + home_team] + param_dict["attack_" + away_team])
-        ]
-
-    team_avgs = calc_means(params_dict, home_team, away_team)
-    team_pred = [[poisson.pmf(i, team_avg) for i in range(max_goals + 1)] for team_avg in team_avgs]
-
-    output_matrix = np.outer(np.array(team_pred[0]), np.array(team_pred[1]))
-
-    correction_matrix = np.array([
-        [rho_correction(h, a, team_avgs[0], team_avgs[1], params_dict["rho"]) for a in range(2)]
-        for h in range(2)
-    ])
-    output_matrix[:2, :2] *= correction_matrix
-
-    return output_matrix
+    return predict_score_matrices(params_dict, [home_team], [away_team], max_goals)[0]
 
+# Keyed on the dataset version token; the leading underscore keeps Streamlit from hashing the frame.
 @st.cache_data(show_spinner=False)
-def solve_parameters_cached(dataset):
-    return solve_parameters(dataset)
+def solve_parameters_cached(dataset_version, _dataset, xi=0.0, fit_directory=None):
+    if fit_directory is None:
+        return solve_parameters(_dataset, xi=xi)
+    return load_or_fit(
+        fit_directory, "dixon_coles", {"xi": xi}, _dataset["week"].max(), dataset_version,
+        lambda warm_start: solve_parameters(_dataset, xi=xi, warm_start=warm_start)
+    )
 
+# One call per round; switching between its fixtures is a lookup.
 @st.cache_data(show_spinner=False)
-def dixon_coles_simulate_match_cached(params_dict, home_team, away_team, max_goals=10):
-    return dixon_coles_simulate_match(params_dict, home_team, away_team, max_goals)
\ No newline at end of file
+def dixon_coles_predict_round_cached(params_dict, home_teams, away_teams, max_goals=10):
+    score_matrices = predict_score_matrices(params_dict, home_teams, away_teams, max_goals)
+    games = [f"{home_team} - {away_team}" for home_team, away_team in zip(home_teams, away_teams)]
+    return score_matrices, summarize_score_matrices(score_matrices, games)
\ No newline at end of file
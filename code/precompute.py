@@ -0,0 +1,153 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import pandas as pd
+from config import dixon_coles_time_decays, LEAGUE_COUNTRY_LOOKUP
+from code.analysis.geometry import build_team_geometry
+from code.analysis.predictive_analytics import get_dixon_coles_artifact_name, get_model_teams, prepare_match_results
+from code.models.bradley_terry import solve_bt_ratings_cached
+from code.models.dixon_coles import solve_parameters_cached
+from code.utils.artifacts import get_artifact_directory, get_artifact_root, get_season_artifact_root, is_artifact_directory_valid, prune_artifacts, publish_artifacts, write_artifact
+from code.utils.coordinate_store import get_player_game_sides
+from code.utils.derived_tables import attach_match_teams, build_team_players
+from code.utils.helpers import DATASET_LOADERS, get_dataset_manifest, get_dataset_version, load_dataset, load_many, warm_parquet_caches
+from code.utils.model_fits import get_model_fit_directory
+from code.utils.player_match_matrix import get_stat_rows
+from code.utils.schemas import DATASET_SCHEMAS
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(__file__), "../data/sofascore/raw/")
+
+def enable_copy_on_write() -> None:
+    # Builders get shallow copies of the shared season tables, as the app's pages do.
+    pd.set_option("mode.copy_on_write", True)
+
+def build_team_players_artifact(directory: str, country: str, league: str, season: str):
+    match_dimension, coordinate_store, shots_df, matrix, season_index = load_many(
+        directory, country, league, season,
+        [{"table": "match_dimension"}, {"table": "coordinate_store"}, {"table": "shots_enriched"}, {"table": "player_match_matrix"}, {"table": "season_index"}]
+    )
+    return build_team_players(
+        {
+            "coordinates_data": attach_match_teams(get_player_game_sides(coordinate_store), match_dimension),
+            "shots_data": shots_df[shots_df["goal_type"] != "own"],
+            "lineups_data": get_stat_rows(matrix, "rating")
+        },
+        season_index
+    )
+
+def build_team_geometry_artifact(directory: str, country: str, league: str, season: str):
+    return build_team_geometry(*load_many(
+        directory, country, league, season,
+        [{"table": "match_dimension"}, {"table": "coordinate_store"}, {"kind": "lineups_data"}, {"kind": "substitutions_data"}, {"table": "season_index"}]
+    ))
+
+def build_dixon_coles_artifact(directory: str, country: str, league: str, season: str, xi: float = 0.0):
+    return solve_parameters_cached(
+        get_dataset_version(directory, country, league, season, kinds=("match_data",)),
+        prepare_match_results(load_dataset(directory, country, league, season, "match_data")),
+        xi,
+        get_model_fit_directory(directory, country, league, season)
+    )
+
+def build_bradley_terry_artifact(directory: str, country: str, league: str, season: str):
+    match_data_df = prepare_match_results(load_dataset(directory, country, league, season, "match_data"))
+    ratings, team_indices = solve_bt_ratings_cached(
+        get_dataset_version(directory, country, league, season, kinds=("match_data",)),
+        match_data_df,
+        get_model_teams(match_data_df),
+        get_model_fit_directory(directory, country, league, season)
+    )
+    return {"ratings": ratings, "team_indices": team_indices}
+
+# Shared tables, written as the loaders in code.utils.helpers serve them, plus cheap lookups.
+TABLE_ARTIFACTS = {
+    "match_dimension": DATASET_LOADERS["match_dimension"],
+    "shots_enriched": DATASET_LOADERS["shots_enriched"],
+    "scorelines": DATASET_LOADERS["scorelines"],
+    "match_stats_cube": DATASET_LOADERS["match_stats_cube"],
+    "player_match_matrix": DATASET_LOADERS["player_match_matrix"],
+    "team_players": build_team_players_artifact
+}
+
+# Page-level results; they hold the GIL, so each runs in its own process. Dixon-Coles is
+# fitted once per time decay offered on the page.
+COMPUTED_ARTIFACTS = {
+    **{get_dixon_coles_artifact_name(xi): partial(build_dixon_coles_artifact, xi=xi) for xi in dixon_coles_time_decays},
+    "team_geometry": build_team_geometry_artifact,
+    "bradley_terry": build_bradley_terry_artifact
+}
+
+ARTIFACT_BUILDERS = {**TABLE_ARTIFACTS, **COMPUTED_ARTIFACTS}
+
+def build_artifact(job: tuple) -> tuple:
+    name, temp_directory, directory, country, league, season = job
+    start = time.perf_counter()
+    write_artifact(temp_directory, name, ARTIFACT_BUILDERS[name](directory, country, league, season))
+    return name, time.perf_counter() - start
+
+def run_jobs(jobs: list, max_workers: int) -> list:
+    max_workers = min(max_workers, len(jobs))
+    if max_workers < 2:
+        return [build_artifact(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"), initializer=enable_copy_on_write) as executor:
+        return list(executor.map(build_artifact, jobs))
+
+def precompute_season(directory: str, country: str, league: str, season: str, max_workers: int, force: bool = False) -> str:
+    # Raw files are parsed into the parquet cache first, so every later step reads parquet.
+    warm_parquet_caches(directory, country, league, season, [{"kind": kind} for kind in DATASET_SCHEMAS], max_workers)
+
+    version = get_dataset_version(directory, country, league, season)
+    artifact_root = get_artifact_root(directory)
+    artifact_directory = get_artifact_directory(artifact_root, country, league, season, version)
+    if is_artifact_directory_valid(artifact_directory) and not force:
+        print(f"{artifact_directory} is up to date")
+        return artifact_directory
+    if force:
+        # Loaders read the published artifacts, so they go first to force a rebuild from the datasets.
+        shutil.rmtree(artifact_directory, ignore_errors=True)
+
+    temp_directory = os.path.join(get_season_artifact_root(artifact_root, country, league, season), f".{version}.tmp-{os.getpid()}")
+    os.makedirs(temp_directory, exist_ok=True)
+
+    timings = [build_artifact((name, temp_directory, directory, country, league, season)) for name in TABLE_ARTIFACTS]
+    timings += run_jobs([(name, temp_directory, directory, country, league, season) for name in COMPUTED_ARTIFACTS], max_workers)
+    for name, seconds in timings:
+        print(f"{name}: {seconds:.2f}s")
+
+    publish_artifacts(
+        temp_directory,
+        artifact_directory,
+        {
+            "version": version,
+            "manifest": get_dataset_manifest(directory, country, league, season),
+            "artifacts": [name for name, _ in timings]
+        }
+    )
+    prune_artifacts(artifact_directory)
+    print(artifact_directory)
+    return artifact_directory
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Builds the derived tables and results the pages read for one season.")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--season", required=True)
+    parser.add_argument("--country", default=None)
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    enable_copy_on_write()
+    country = args.country or LEAGUE_COUNTRY_LOOKUP.get(args.league, "unknown")
+    precompute_season(args.directory, country, args.league, args.season, args.workers, force=args.force)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+from config import LEAGUE_COUNTRY_LOOKUP
+from code.utils.ingest import place_delta_file
+from code.utils.parquet_cache import ensure_cached_json_file, get_cache_directory
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(__file__), "../data/sofascore/raw/")
+
+def publish_delta(source_file: str, directory: str, country: str, league: str, season: str, kind: str, week: int) -> str:
+    # The file is parsed into the parquet cache here, so the app only merges it into the
+    # season tables it already holds the next time a page loads them.
+    raw_file = place_delta_file(source_file, directory, country, league, season, kind, week)
+    ensure_cached_json_file(raw_file, get_cache_directory(directory), kind)
+    return raw_file
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Publishes one round's delta file for a dataset kind into the season's raw directory.")
+    parser.add_argument("file")
+    parser.add_argument("--league", required=True)
+    parser.add_argument("--season", required=True)
+    parser.add_argument("--kind", required=True)
+    parser.add_argument("--week", type=int, required=True)
+    parser.add_argument("--country", default=None)
+    parser.add_argument("--directory", default=DEFAULT_DIRECTORY)
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    country = args.country or LEAGUE_COUNTRY_LOOKUP.get(args.league, "unknown")
+    print(publish_delta(args.file, args.directory, country, args.league, args.season, args.kind, args.week))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
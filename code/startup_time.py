@@ -0,0 +1,53 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIRECTORY = os.path.normpath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# Libraries that only analysis pages need; none of them should load with the app shell.
+HEAVY_MODULES = ["pandas", "pyarrow", "matplotlib", "seaborn", "scipy", "sklearn", "mplsoccer", "adjustText"]
+
+MEASURE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "loaded": [name for name in {heavy_modules!r} if name in sys.modules]}}))
+"""
+
+def measure_import(module: str) -> dict:
+    # A fresh interpreter per run, so nothing is served from an earlier import.
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT.format(module=module, heavy_modules=HEAVY_MODULES)],
+        cwd=ROOT_DIRECTORY,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure_startup(module: str = "app", runs: int = 5) -> dict:
+    results = [measure_import(module) for _ in range(runs)]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_seconds": statistics.median(result["seconds"] for result in results),
+        "min_seconds": min(result["seconds"] for result in results),
+        "loaded": results[-1]["loaded"]
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measures how long importing the app (or a page module) takes in a fresh interpreter.")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    result = measure_startup(args.module, args.runs)
+    print(f"{result['module']}: median {result['median_seconds']:.2f}s, min {result['min_seconds']:.2f}s over {result['runs']} runs")
+    print(f"heavy modules loaded: {', '.join(result['loaded']) or 'none'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from code.utils.parquet_cache import read_cache_meta
+
+ARTIFACT_FORMAT_VERSION = 1
+
+def get_artifact_root(raw_directory: str) -> str:
+    return os.path.normpath(os.path.join(raw_directory, os.pardir, "artifacts"))
+
+def get_season_artifact_root(artifact_root: str, country: str, league: str, season: str) -> str:
+    return os.path.join(artifact_root, f"sofascore_{country}_{league}_{season}")
+
+def get_artifact_directory(artifact_root: str, country: str, league: str, season: str, version: str) -> str:
+    # One directory per dataset version token, so a data drop never serves older results.
+    return os.path.join(get_season_artifact_root(artifact_root, country, league, season), version)
+
+def is_artifact_directory_valid(artifact_directory: str) -> bool:
+    meta = read_cache_meta(os.path.join(artifact_directory, "meta.json"))
+    return meta is not None and meta.get("format_version") == ARTIFACT_FORMAT_VERSION
+
+def encode_field(field_directory: str, key: str, value):
+    if isinstance(value, pd.DataFrame):
+        value.to_parquet(os.path.join(field_directory, f"{key}.parquet"), index=False)
+        return {"type": "frame"}
+    if isinstance(value, pd.Index):
+        return {"type": "index", "dtype": str(value.dtype), "values": value.tolist()}
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        np.save(os.path.join(field_directory, f"{key}.npy"), value)
+        return {"type": "array"}
+    if isinstance(value, np.ndarray):
+        return {"type": "objects", "values": value.tolist()}
+    return {"type": "value", "value": value}
+
+def decode_field(field_directory: str, key: str, field: dict):
+    if field["type"] == "frame":
+        return pd.read_parquet(os.path.join(field_directory, f"{key}.parquet"))
+    if field["type"] == "index":
+        return pd.Index(field["values"], dtype=field["dtype"])
+    if field["type"] == "array":
+        return np.load(os.path.join(field_directory, f"{key}.npy"))
+    if field["type"] == "objects":
+        return np.array(field["values"], dtype=object)
+    return field["value"]
+
+def write_artifact(artifact_directory: str, name: str, value) -> None:
+    # Frames are written as parquet; dicts (cubes, matrices, model fits) as one directory per artifact.
+    if isinstance(value, pd.DataFrame):
+        value.to_parquet(os.path.join(artifact_directory, f"{name}.parquet"), index=False)
+        return
+
+    field_directory = os.path.join(artifact_directory, name)
+    os.makedirs(field_directory, exist_ok=True)
+    fields = {key: encode_field(field_directory, key, field) for key, field in value.items()}
+    with open(os.path.join(field_directory, "fields.json"), "w", encoding="utf-8") as f:
+        json.dump(fields, f, ensure_ascii=False)
+
+def read_artifact(artifact_directory: str, name: str):
+    if not is_artifact_directory_valid(artifact_directory):
+        return None
+
+    parquet_path = os.path.join(artifact_directory, f"{name}.parquet")
+    field_directory = os.path.join(artifact_directory, name)
+    try:
+        if os.path.exists(parquet_path):
+            return pd.read_parquet(parquet_path)
+        fields = read_cache_meta(os.path.join(field_directory, "fields.json"))
+        if fields is None:
+            return None
+        return {key: decode_field(field_directory, key, field) for key, field in fields.items()}
+    except (ImportError, OSError, ValueError, KeyError):
+        return None
+
+def publish_artifacts(temp_directory: str, artifact_directory: str, meta: dict) -> None:
+    with open(os.path.join(temp_directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({**meta, "format_version": ARTIFACT_FORMAT_VERSION}, f, ensure_ascii=False)
+
+    # Readers only ever see a finished directory; a previous build of the same version is swapped out.
+    if os.path.exists(artifact_directory):
+        shutil.rmtree(artifact_directory)
+    os.replace(temp_directory, artifact_directory)
+
+def prune_artifacts(artifact_directory: str) -> None:
+    season_root = os.path.dirname(artifact_directory)
+    for entry in os.listdir(season_root):
+        path = os.path.join(season_root, entry)
+        if path != artifact_directory and not entry.startswith(".") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from code.utils.entity_index import build_code_offsets, get_code_slice
+from code.utils.interning import get_player_names
+from code.utils.parquet_cache import ensure_cached_json_file, get_cache_paths, read_cache_meta
+
+COORDINATE_STORE_VERSION = 2
+
+# Flat per-row columns, sorted by the season index's player code and then game.
+COORDINATE_STORE_COLUMNS = {
+    "x": "float32",
+    "y": "float32",
+    "player": "int32",
+    "game": "int32",
+    "is_home": "bool",
+    "player_id": "int32"
+}
+
+def get_coordinate_store_directory(cache_directory: str, country: str, league: str, season: str) -> str:
+    return os.path.join(cache_directory, "coordinate_store", f"sofascore_{country}_{league}_{season}")
+
+def get_source_hashes(raw_files: list, cache_directory: str) -> list:
+    hashes = []
+    for raw_file in sorted(raw_files):
+        ensure_cached_json_file(raw_file, cache_directory, "coordinates_data")
+        meta = read_cache_meta(get_cache_paths(raw_file, cache_directory, "coordinates_data")[1])
+        hashes.append(meta.get("sha256") if meta else None)
+    return hashes
+
+def get_player_index_hash(season_index: dict) -> str:
+    return hashlib.sha256(season_index["players"]["ids"].to_numpy(dtype="int64").tobytes()).hexdigest()[:16]
+
+def is_coordinate_store_valid(store_directory: str, source_hashes: list, season_index: dict) -> bool:
+    # Player codes are positions in the season index, so a new player elsewhere invalidates them.
+    meta = read_cache_meta(os.path.join(store_directory, "meta.json"))
+    return (
+        meta is not None and
+        None not in source_hashes and
+        meta.get("version") == COORDINATE_STORE_VERSION and
+        meta.get("sources") == source_hashes and
+        meta.get("player_index") == get_player_index_hash(season_index)
+    )
+
+def save_array(store_directory: str, name: str, values: np.ndarray) -> None:
+    temp_path = os.path.join(store_directory, f"{name}.tmp.npy")
+    np.save(temp_path, values)
+    os.replace(temp_path, os.path.join(store_directory, f"{name}.npy"))
+
+def build_coordinate_store(coordinates_df: pd.DataFrame, season_index: dict) -> dict:
+    game_ids, game_codes = np.unique(coordinates_df["game_id"].to_numpy(dtype="int32"), return_inverse=True)
+    player_codes = season_index["players"]["ids"].get_indexer(coordinates_df["player_id"].to_numpy()).astype("int32")
+
+    order = np.lexsort((coordinates_df["player_id"].to_numpy(), game_codes, player_codes))
+    columns = {
+        "x": coordinates_df["x"].to_numpy(),
+        "y": coordinates_df["y"].to_numpy(),
+        "player": player_codes,
+        "game": game_codes,
+        "is_home": (coordinates_df["team"] == "home").to_numpy(),
+        "player_id": coordinates_df["player_id"].to_numpy()
+    }
+
+    store = {name: columns[name][order].astype(dtype) for name, dtype in COORDINATE_STORE_COLUMNS.items()}
+
+    store["player_offsets"] = build_code_offsets(store["player"], len(season_index["players"]["ids"]))
+    store["game_ids"] = game_ids
+    store["player_index"] = get_player_index_hash(season_index)
+    return store
+
+def write_coordinate_store(store: dict, store_directory: str, source_hashes: list) -> None:
+    os.makedirs(store_directory, exist_ok=True)
+    for name in [*COORDINATE_STORE_COLUMNS, "player_offsets", "game_ids"]:
+        save_array(store_directory, name, store[name])
+
+    temp_path = os.path.join(store_directory, "meta.json.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": COORDINATE_STORE_VERSION,
+                "sources": source_hashes,
+                "rows": len(store["x"]),
+                "player_index": store["player_index"]
+            },
+            f,
+            ensure_ascii=False
+        )
+    os.replace(temp_path, os.path.join(store_directory, "meta.json"))
+
+def open_coordinate_store(store_directory: str) -> dict:
+    meta = read_cache_meta(os.path.join(store_directory, "meta.json"))
+    store = {
+        name: np.load(os.path.join(store_directory, f"{name}.npy"), mmap_mode="r")
+        for name in [*COORDINATE_STORE_COLUMNS, "player_offsets"]
+    }
+    store["game_ids"] = np.load(os.path.join(store_directory, "game_ids.npy"))
+    store["player_index"] = meta["player_index"]
+    return store
+
+def get_player_slice(store: dict, player_code: int) -> slice:
+    return get_code_slice(store["player_offsets"], player_code)
+
+def get_player_game_slice(store: dict, player_code: int, game_id: int) -> slice:
+    rows = get_player_slice(store, player_code)
+    game = np.searchsorted(store["game_ids"], game_id)
+    if game >= len(store["game_ids"]) or store["game_ids"][game] != game_id:
+        return slice(0, 0)
+    games = store["game"][rows]
+    return slice(
+        rows.start + int(np.searchsorted(games, game, side="left")),
+        rows.start + int(np.searchsorted(games, game, side="right"))
+    )
+
+def get_player_game_means(store: dict, season_index: dict) -> pd.DataFrame:
+    # Rows are already grouped by player and game, so segment sums replace a groupby.
+    player, game, player_id = store["player"], store["game"], store["player_id"]
+    if len(player) == 0:
+        return pd.DataFrame(columns=["game_id", "player_name", "player_id", "x", "y"])
+
+    is_start = np.ones(len(player), dtype=bool)
+    is_start[1:] = (player[1:] != player[:-1]) | (game[1:] != game[:-1]) | (player_id[1:] != player_id[:-1])
+    starts = np.flatnonzero(is_start)
+    counts = np.diff(np.append(starts, len(player)))
+
+    return pd.DataFrame({
+        "game_id": store["game_ids"][game[starts]],
+        "player_name": get_player_names(season_index, player[starts]),
+        "player_id": player_id[starts],
+        "x": (np.add.reduceat(store["x"], starts, dtype="float64") / counts).astype("float32"),
+        "y": (np.add.reduceat(store["y"], starts, dtype="float64") / counts).astype("float32")
+    })
+
+def get_player_game_sides(store: dict) -> pd.DataFrame:
+    player, game, is_home = store["player"], store["game"], store["is_home"]
+    keys = np.unique((player.astype("int64") * len(store["game_ids"]) + game) * 2 + is_home)
+    return pd.DataFrame({
+        "game_id": store["game_ids"][(keys // 2) % len(store["game_ids"])],
+        "player_code": (keys // 2 // len(store["game_ids"])).astype("int32"),
+        "is_home": (keys % 2).astype(bool)
+    })
+
+def get_game_team_codes(store: dict, match_dimension: pd.DataFrame) -> tuple:
+    teams = match_dimension.drop_duplicates(subset="game_id").set_index("game_id").reindex(store["game_ids"])
+    return teams["home_team_code"].to_numpy(), teams["away_team_code"].to_numpy()
+
+def get_player_team_coordinates(store: dict, match_dimension: pd.DataFrame, player_codes, team_code: int) -> tuple:
+    # Namesakes share a display name, so every code shown under it is read; only the team's games are kept.
+    home_team_code, away_team_code = get_game_team_codes(store, match_dimension)
+    x, y = [store["x"][:0]], [store["y"][:0]]
+    for player_code in player_codes:
+        rows = get_player_slice(store, player_code)
+        games = store["game"][rows]
+        is_team = np.where(store["is_home"][rows], home_team_code[games], away_team_code[games]) == team_code
+        x.append(store["x"][rows][is_team])
+        y.append(store["y"][rows][is_team])
+    return np.concatenate(x), np.concatenate(y)
@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DATASET_STORE_BUDGET_MB = int(os.environ.get("DATASET_STORE_BUDGET_MB", "1024"))
+
+@st.cache_resource(show_spinner=False)
+def get_dataset_store(budget_mb: int = DATASET_STORE_BUDGET_MB) -> dict:
+    return {
+        "budget_bytes": budget_mb << 20,
+        "used_bytes": 0,
+        "seasons": OrderedDict(),
+        "lock": threading.Lock(),
+        "build_locks": {}
+    }
+
+def get_season_key(directory: str, country: str, league: str, season: str) -> tuple:
+    return (os.path.normpath(directory), country, league, season)
+
+def freeze_filters(filters) -> tuple:
+    if not filters:
+        return ()
+    frozen = []
+    for column, value in sorted(filters.items()):
+        if isinstance(value, set):
+            value = tuple(sorted(value))
+        elif isinstance(value, list):
+            value = tuple(value)
+        frozen.append((column, value))
+    return tuple(frozen)
+
+def estimate_nbytes(value) -> int:
+    # Cubes, matrices and sorted copies are dicts of frames and arrays, so containers are summed.
+    # Memory-mapped arrays live in the page cache rather than the heap and are not counted.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, np.memmap):
+        return 0
+    return int(getattr(value, "nbytes", 0))
+
+# Callers get shallow copies of the stored frames; the entry points (app.py, code.precompute)
+# turn on pandas copy-on-write so an in-place edit never reaches the stored arrays.
+def share(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+def lookup_table(store: dict, season_key: tuple, table_key: tuple):
+    season = store["seasons"].get(season_key)
+    if season is None or table_key not in season["tables"]:
+        return None
+    store["seasons"].move_to_end(season_key)
+    return season["tables"][table_key]
+
+def sync_season_version(store: dict, season_key: tuple, version) -> None:
+    # A season built from other file contents is dropped as a whole.
+    season = store["seasons"].get(season_key)
+    if version is not None and season is not None and season["version"] != version:
+        store["seasons"].pop(season_key)
+        store["used_bytes"] -= season["bytes"]
+
+def evict_seasons(store: dict, current_season_key: tuple) -> None:
+    # Whole seasons go, least recently used first; the season being served is always kept.
+    while store["used_bytes"] > store["budget_bytes"]:
+        season_key = next(iter(store["seasons"]))
+        if season_key == current_season_key:
+            break
+        season = store["seasons"].pop(season_key)
+        store["used_bytes"] -= season["bytes"]
+
+def get_shared_table(season_key: tuple, table_key: tuple, builder, version=None):
+    store = get_dataset_store()
+
+    with store["lock"]:
+        sync_season_version(store, season_key, version)
+        value = lookup_table(store, season_key, table_key)
+        if value is not None:
+            return share(value)
+        build_lock = store["build_locks"].setdefault((season_key, table_key), threading.Lock())
+
+    # One session builds a missing table; concurrent sessions wait for it instead of parsing it again.
+    with build_lock:
+        with store["lock"]:
+            value = lookup_table(store, season_key, table_key)
+        if value is not None:
+            return share(value)
+
+        value = builder()
+        nbytes = estimate_nbytes(value)
+
+        with store["lock"]:
+            season = store["seasons"].setdefault(season_key, {"tables": {}, "table_bytes": {}, "bytes": 0, "version": version})
+            store["build_locks"].pop((season_key, table_key), None)
+            if version is not None and season["version"] != version:
+                return share(value)
+            season["tables"][table_key] = value
+            season["table_bytes"][table_key] = nbytes
+            season["bytes"] += nbytes
+            store["used_bytes"] += nbytes
+            store["seasons"].move_to_end(season_key)
+            evict_seasons(store, season_key)
+
+    return share(value)
+
+def clear_season(season_key: tuple) -> None:
+    store = get_dataset_store()
+    with store["lock"]:
+        season = store["seasons"].pop(season_key, None)
+        if season is not None:
+            store["used_bytes"] -= season["bytes"]
+
+def get_stored_version(season_key: tuple):
+    store = get_dataset_store()
+    with store["lock"]:
+        season = store["seasons"].get(season_key)
+        return season["version"] if season is not None else None
+
+def get_season_tables(season_key: tuple) -> dict:
+    store = get_dataset_store()
+    with store["lock"]:
+        season = store["seasons"].get(season_key)
+        return dict(season["tables"]) if season is not None else {}
+
+def replace_season_tables(season_key: tuple, tables: dict, version=None) -> None:
+    # Sessions holding the previous frames keep them; new lookups get the replacements.
+    # Sizes are measured outside the lock, and a replaced table's size is the one recorded.
+    table_bytes = {table_key: estimate_nbytes(value) for table_key, value in tables.items()}
+    store = get_dataset_store()
+    with store["lock"]:
+        season = store["seasons"].get(season_key)
+        if season is None:
+            return
+        if version is not None:
+            season["version"] = version
+        for table_key, value in tables.items():
+            season["tables"].pop(table_key, None)
+            nbytes = table_bytes[table_key] - season["table_bytes"].pop(table_key, 0)
+            if value is not None:
+                season["tables"][table_key] = value
+                season["table_bytes"][table_key] = table_bytes[table_key]
+            season["bytes"] += nbytes
+            store["used_bytes"] += nbytes
+        evict_seasons(store, season_key)
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+from code.utils.interning import build_name_index, get_player_names, intern_names
+
+ENDED_STATUSES = ["Ended", "Retired"]
+
+MATCH_DIMENSION_COLUMNS = [
+    "country",
+    "tournament",
+    "season",
+    "week",
+    "game_id",
+    "home_team",
+    "home_team_id",
+    "away_team",
+    "away_team_id",
+    "status",
+    "start_timestamp",
+    "injury_time_1",
+    "injury_time_2",
+    "home_score_display",
+    "away_score_display",
+    "home_score_period1",
+    "away_score_period1",
+    "home_score_period2",
+    "away_score_period2"
+]
+
+SCORELINE_COLUMNS = [
+    "tournament",
+    "season",
+    "week",
+    "game_id",
+    "home_team",
+    "away_team",
+    "home_team_code",
+    "away_team_code"
+]
+
+def build_match_dimension(match_data_df: pd.DataFrame, teams: pd.Index = None) -> pd.DataFrame:
+    if match_data_df.empty:
+        return match_data_df
+
+    columns = [column for column in MATCH_DIMENSION_COLUMNS if column in match_data_df.columns]
+    match_dimension = match_data_df.loc[match_data_df["status"].isin(ENDED_STATUSES), columns]
+    match_dimension = match_dimension.drop_duplicates(subset="game_id").reset_index(drop=True)
+
+    # Dense team codes over every fixture of the season, so they match build_season_index.
+    if teams is None:
+        teams = build_name_index(match_data_df["home_team"], match_data_df["away_team"])
+    match_dimension["home_team_code"] = intern_names(match_dimension["home_team"], teams)
+    match_dimension["away_team_code"] = intern_names(match_dimension["away_team"], teams)
+    return match_dimension
+
+def get_home_mask(fact_df: pd.DataFrame) -> np.ndarray:
+    # Shots carry an is_home flag; coordinates and lineups a "home"/"away" team column.
+    if "is_home" in fact_df.columns:
+        return fact_df["is_home"].fillna(False).to_numpy(dtype=bool)
+    return (fact_df["team"] == "home").to_numpy(dtype=bool)
+
+def attach_match_teams(fact_df: pd.DataFrame, match_dimension: pd.DataFrame, columns=()) -> pd.DataFrame:
+    columns = [
+        column for column in ["home_team", "away_team", "home_team_code", "away_team_code", *columns]
+        if column in match_dimension.columns and column not in fact_df.columns
+    ]
+    fact_df = fact_df.merge(match_dimension[["game_id", *columns]], on="game_id")
+
+    home_mask = get_home_mask(fact_df)
+    home_team = fact_df["home_team"].to_numpy(dtype=object)
+    away_team = fact_df["away_team"].to_numpy(dtype=object)
+
+    fact_df["team_name"] = np.where(home_mask, home_team, away_team)
+    fact_df["opponent_name"] = np.where(home_mask, away_team, home_team)
+    if "home_team_code" in fact_df.columns:
+        fact_df["team_code"] = np.where(home_mask, fact_df["home_team_code"], fact_df["away_team_code"]).astype("int32")
+        fact_df["opponent_code"] = np.where(home_mask, fact_df["away_team_code"], fact_df["home_team_code"]).astype("int32")
+    return fact_df
+
+def add_game_state(shots_df: pd.DataFrame) -> pd.DataFrame:
+    # Goals already scored before each shot, from the shooting team's point of view.
+    # is_home marks the credited side, own goals included.
+    ordered = shots_df.sort_values(["game_id", "time", "added_time", "time_seconds"], kind="stable")
+    is_home = ordered["is_home"].to_numpy(dtype=bool)
+    home_goals = (ordered["is_goal"].to_numpy() == 1) & is_home
+    away_goals = (ordered["is_goal"].to_numpy() == 1) & ~is_home
+
+    game_ids = ordered["game_id"]
+    home_before = pd.Series(home_goals, index=ordered.index).groupby(game_ids.to_numpy()).cumsum().to_numpy() - home_goals
+    away_before = pd.Series(away_goals, index=ordered.index).groupby(game_ids.to_numpy()).cumsum().to_numpy() - away_goals
+
+    score_difference = np.where(is_home, home_before - away_before, away_before - home_before)
+    shots_df["score_difference"] = pd.Series(score_difference, index=ordered.index).reindex(shots_df.index).astype("int16")
+    shots_df["game_state"] = np.select(
+        [shots_df["score_difference"] > 0, shots_df["score_difference"] < 0],
+        ["Leading", "Trailing"],
+        default="Drawing"
+    )
+    return shots_df
+
+def build_shots_enriched(shots_df: pd.DataFrame, match_dimension: pd.DataFrame) -> pd.DataFrame:
+    shots_df = attach_match_teams(shots_df, match_dimension, columns=("injury_time_1", "injury_time_2"))
+
+    shots_df["is_goal"] = (shots_df["shot_type"] == "goal").astype(int)
+    shots_df["period"] = np.where(shots_df["time"] <= 45, "First Half", "Second Half")
+    shots_df["net_time"] = shots_df["time"] + shots_df["added_time"].fillna(0)
+    shots_df["player_coordinates_x_flipped"] = 100 - shots_df["player_coordinates_x"]
+    shots_df["player_coordinates_y_flipped"] = 100 - shots_df["player_coordinates_y"]
+    return add_game_state(shots_df)
+
+def build_team_players(sources: dict, season_index: dict) -> pd.DataFrame:
+    # Selectable players per team, one block per source dataset. Names come from the season
+    # index, so each one resolves back to player codes.
+    team_players = pd.concat(
+        [
+            pd.DataFrame({
+                "source": source,
+                "team_name": df["team_name"].to_numpy(dtype=object),
+                "player_name": get_player_names(season_index, df["player_code"])
+            })
+            for source, df in sources.items()
+        ],
+        ignore_index=True
+    )
+    return team_players.dropna().drop_duplicates().reset_index(drop=True)
+
+def build_scorelines(match_dimension: pd.DataFrame, shots_df: pd.DataFrame) -> pd.DataFrame:
+    # Scores are counted from goal events in one pass; own goals credit the is_home side.
+    goals = shots_df.loc[shots_df["is_goal"] == 1, ["game_id"]]
+    goals["is_home"] = get_home_mask(shots_df.loc[shots_df["is_goal"] == 1])
+    counts = goals.groupby(["game_id", "is_home"]).size().unstack(fill_value=0).reindex(columns=[True, False], fill_value=0)
+    counts = counts.reindex(match_dimension["game_id"].to_numpy(), fill_value=0)
+
+    scorelines = match_dimension[[column for column in SCORELINE_COLUMNS if column in match_dimension.columns]].copy()
+    scorelines["home_score"] = counts[True].to_numpy(dtype="int64")
+    scorelines["away_score"] = counts[False].to_numpy(dtype="int64")
+    scorelines["goal_difference"] = scorelines["home_score"] - scorelines["away_score"]
+    scorelines["result"] = np.select(
+        [scorelines["goal_difference"] > 0, scorelines["goal_difference"] < 0],
+        ["home", "away"],
+        default="draw"
+    )
+    scorelines["home_points"] = np.select([scorelines["goal_difference"] > 0, scorelines["goal_difference"] < 0], [3, 0], default=1)
+    scorelines["away_points"] = np.select([scorelines["goal_difference"] < 0, scorelines["goal_difference"] > 0], [3, 0], default=1)
+    scorelines["home_halftime_score"] = match_dimension["home_score_period1"].to_numpy()
+    scorelines["away_halftime_score"] = match_dimension["away_score_period1"].to_numpy()
+    return scorelines
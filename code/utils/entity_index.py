@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+def get_entity_order(team_codes, player_codes, game_ids) -> np.ndarray:
+    # Stable, so rows of one player in one game keep their source order.
+    return np.lexsort((np.asarray(game_ids), np.asarray(player_codes), np.asarray(team_codes)))
+
+def build_code_offsets(sorted_codes, n_codes: int) -> np.ndarray:
+    # CSR index: rows of code c are offsets[c]:offsets[c + 1]. Unknown codes (-1) sort first and
+    # fall outside every code's range.
+    sorted_codes = np.asarray(sorted_codes)
+    offsets = np.zeros(n_codes + 1, dtype="int64")
+    offsets[0] = np.count_nonzero(sorted_codes < 0)
+    counts = np.bincount(sorted_codes[sorted_codes >= 0], minlength=n_codes)
+    np.cumsum(counts[:n_codes], out=offsets[1:])
+    offsets[1:] += offsets[0]
+    return offsets
+
+def get_code_slice(offsets: np.ndarray, code: int) -> slice:
+    if code < 0 or code + 1 >= len(offsets):
+        return slice(0, 0)
+    return slice(int(offsets[code]), int(offsets[code + 1]))
+
+def build_player_offsets(sorted_team_codes, sorted_player_codes) -> tuple:
+    # One segment per (team, player) run of the entity order: rows of segment s are
+    # player_offsets[s]:player_offsets[s + 1], and segment_players[s] is its player code.
+    sorted_team_codes, sorted_player_codes = np.asarray(sorted_team_codes), np.asarray(sorted_player_codes)
+    is_start = np.ones(len(sorted_player_codes), dtype=bool)
+    is_start[1:] = (sorted_team_codes[1:] != sorted_team_codes[:-1]) | (sorted_player_codes[1:] != sorted_player_codes[:-1])
+    starts = np.flatnonzero(is_start)
+    return np.append(starts, len(sorted_player_codes)).astype("int64"), sorted_player_codes[starts].astype("int32")
+
+def add_entity_offsets(entity_index: dict, n_teams: int) -> dict:
+    team_codes, player_codes = entity_index["rows"]["team_code"].to_numpy(), entity_index["rows"]["player_code"].to_numpy()
+    entity_index["team_offsets"] = build_code_offsets(team_codes, n_teams)
+    entity_index["player_offsets"], entity_index["segment_players"] = build_player_offsets(team_codes, player_codes)
+    return entity_index
+
+def get_player_slice(entity_index: dict, team_code: int, player_code: int) -> slice:
+    # A team's segments are contiguous and ordered by player code, so both steps are binary searches.
+    team_rows = get_code_slice(entity_index["team_offsets"], team_code)
+    first, last = np.searchsorted(entity_index["player_offsets"][:-1], [team_rows.start, team_rows.stop])
+    segment = first + int(np.searchsorted(entity_index["segment_players"][first:last], player_code))
+    if segment >= last or entity_index["segment_players"][segment] != player_code:
+        return slice(0, 0)
+    return slice(int(entity_index["player_offsets"][segment]), int(entity_index["player_offsets"][segment + 1]))
+
+def build_entity_rows(df: pd.DataFrame, n_teams: int) -> dict:
+    rows = df.take(get_entity_order(df["team_code"], df["player_code"], df["game_id"])).reset_index(drop=True)
+    return add_entity_offsets({"rows": rows}, n_teams)
+
+def get_team_rows(entity_rows: dict, team_code: int) -> pd.DataFrame:
+    return entity_rows["rows"].iloc[get_code_slice(entity_rows["team_offsets"], team_code)]
+
+def get_player_rows(entity_rows: dict, team_code: int, player_code: int) -> pd.DataFrame:
+    return entity_rows["rows"].iloc[get_player_slice(entity_rows, team_code, player_code)]
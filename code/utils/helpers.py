@@ -2,15 +2,31 @@ import base64
 import io
 import os
 import glob
-import gzip
+import importlib
 import pandas as pd
 import re
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unidecode import unidecode
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from config import change_situations, change_body_parts, change_goal_locations, change_player_positions
+from code.utils.artifacts import get_artifact_directory, get_artifact_root, read_artifact
+from code.utils.coordinate_store import build_coordinate_store, get_coordinate_store_directory, get_source_hashes, is_coordinate_store_valid, open_coordinate_store, write_coordinate_store
+from code.utils.dataset_store import freeze_filters, get_season_key, get_shared_table
+from code.utils.entity_index import build_entity_rows
+from code.utils.interning import add_player_codes, build_season_index
+from code.utils.manifest import build_manifest, get_manifest_token
+from code.utils.match_stats import build_match_stats_cube
+from code.utils.player_match_matrix import build_player_match_matrix
+from code.utils.derived_tables import attach_match_teams, build_match_dimension, build_scorelines, build_shots_enriched
+from code.utils.parquet_cache import cache_json_file, drop_superseded_rows, get_cache_directory, get_part_order, load_cached_json_file, needs_cache_build
+from code.utils.schemas import DATASET_SCHEMAS, apply_schema
 
-def load_styles():
-    with open("assets/style.css") as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
+def load_analysis(name: str):
+    # Analysis pages pull in seaborn, mplsoccer, scipy and sklearn, so each is imported when first shown.
+    return importlib.import_module(f"code.analysis.{name}")
 
 def add_download_button(fig, file_name: str = "grafik.png") -> str:
     buf = io.BytesIO()
@@ -42,25 +58,375 @@ def add_footer(fig, data_source="SofaScore", prepared_by="@urazdev", extra_text=
         color="gray"
     )
 
-@st.cache_data(show_spinner=False)
-def load_filtered_json_files(directory: str, country: str, league: str, season: str, subdirectory: str) -> pd.DataFrame:
-    path = os.path.join(directory, subdirectory, f"sofascore_{country}_{league}_{season}_{subdirectory}.json*")
-    files = glob.glob(path)
+DATASET_LOAD_WORKERS = int(os.environ.get("DATASET_LOAD_WORKERS", "4"))
+
+def get_season_files(directory: str, country: str, league: str, season: str, subdirectory: str) -> list:
+    path = os.path.join(directory, subdirectory, f"sofascore_{country}_{league}_{season}_{subdirectory}")
+    return sorted(glob.glob(f"{path}.json*") + glob.glob(f"{path}_week_*.json*"), key=get_part_order)
+
+def get_dataset_manifest(directory: str, country: str, league: str, season: str, kinds=None) -> dict:
+    kinds = DATASET_SCHEMAS if kinds is None else kinds
+    return build_manifest(
+        {kind: get_season_files(directory, country, league, season, kind) for kind in kinds},
+        get_cache_directory(directory)
+    )
+
+def get_dataset_version(directory: str, country: str, league: str, season: str, kinds=None) -> str:
+    return get_manifest_token(get_dataset_manifest(directory, country, league, season, kinds))
+
+def get_season_version(directory: str, country: str, league: str, season: str) -> str:
+    # The version the shared tables are keyed on. New _week_N files are patched into the tables
+    # already built instead of dropping the season; ingest imports this module, hence the late import.
+    from code.utils.ingest import sync_season_deltas
+
+    manifest = get_dataset_manifest(directory, country, league, season)
+    version = get_manifest_token(manifest)
+    sync_season_deltas(directory, country, league, season, manifest, version)
+    return version
+
+def read_season_artifact(directory: str, country: str, league: str, season: str, name: str):
+    artifact_directory = get_artifact_directory(
+        get_artifact_root(directory), country, league, season,
+        get_dataset_version(directory, country, league, season)
+    )
+    return read_artifact(artifact_directory, name)
+
+def load_artifact_or_build(directory: str, country: str, league: str, season: str, name: str, builder):
+    # Results written by code.precompute for the current data are read as they are; anything missing is built here.
+    value = read_season_artifact(directory, country, league, season, name)
+    return builder() if value is None else value
+
+def read_dataset(directory: str, country: str, league: str, season: str, kind: str, columns=None, filters=None) -> pd.DataFrame:
+    files = get_season_files(directory, country, league, season, kind)
+    cache_directory = get_cache_directory(directory)
+
+    # Delta parts can restate games from earlier parts, so game_id is read even when not projected.
+    read_columns = columns
+    if len(files) > 1 and columns is not None and "game_id" not in columns:
+        read_columns = [*columns, "game_id"]
 
     dataframes = []
     for file in files:
-        if file.endswith(".gz"):
-            with gzip.open(file, 'rt', encoding='utf-8') as f:
-                dataframes.append(pd.read_json(f))
-        else:
-            dataframes.append(pd.read_json(file))
+        dataframes.append(load_cached_json_file(file, cache_directory, kind, columns=read_columns, filters=filters))
+
+    if not dataframes:
+        return pd.DataFrame()
+    df = pd.concat(drop_superseded_rows(dataframes), ignore_index=True)
+    if read_columns is not columns:
+        df = df[list(columns)]
+    return apply_schema(df, kind)
+
+def load_filtered_json_files(directory: str, country: str, league: str, season: str, subdirectory: str) -> pd.DataFrame:
+    return load_dataset(directory, country, league, season, subdirectory)
+
+def load_dataset(directory: str, country: str, league: str, season: str, kind: str, columns=None, filters=None) -> pd.DataFrame:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("dataset", kind, tuple(columns) if columns is not None else None, freeze_filters(filters)),
+        lambda: read_dataset(directory, country, league, season, kind, columns=columns, filters=filters),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_match_dimension(directory: str, country: str, league: str, season: str) -> pd.DataFrame:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("match_dimension",),
+        lambda: load_artifact_or_build(
+            directory, country, league, season, "match_dimension",
+            lambda: build_match_dimension(load_dataset(directory, country, league, season, "match_data"))
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def read_season_index(directory: str, country: str, league: str, season: str) -> dict:
+    return build_season_index(
+        load_dataset(directory, country, league, season, "match_data", columns=("home_team", "away_team")),
+        load_dataset(directory, country, league, season, "lineups_data", columns=("player_id", "player_name")),
+        load_dataset(directory, country, league, season, "substitutions_data", columns=("player_in", "player_in_id", "player_out", "player_out_id")),
+        load_dataset(directory, country, league, season, "shots_data", columns=("player_id", "player_name"))
+    )
+
+def load_season_index(directory: str, country: str, league: str, season: str) -> dict:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("season_index",),
+        lambda: read_season_index(directory, country, league, season),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_team_fact_table(directory: str, country: str, league: str, season: str, kind: str, columns=None, filters=None) -> pd.DataFrame:
+    def build():
+        fact_df = read_dataset(directory, country, league, season, kind, columns=columns, filters=filters)
+        fact_df = attach_match_teams(fact_df, load_match_dimension(directory, country, league, season))
+        return add_player_codes(fact_df, load_season_index(directory, country, league, season))
+
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("team_fact", kind, tuple(columns) if columns is not None else None, freeze_filters(filters)),
+        build,
+        version=get_season_version(directory, country, league, season)
+    )
+
+def read_coordinate_store(directory: str, country: str, league: str, season: str) -> dict:
+    cache_directory = get_cache_directory(directory)
+    store_directory = get_coordinate_store_directory(cache_directory, country, league, season)
+    source_hashes = get_source_hashes(get_season_files(directory, country, league, season, "coordinates_data"), cache_directory)
+    season_index = load_season_index(directory, country, league, season)
+
+    if is_coordinate_store_valid(store_directory, source_hashes, season_index):
+        try:
+            return open_coordinate_store(store_directory)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    store = build_coordinate_store(
+        read_dataset(directory, country, league, season, "coordinates_data", columns=("game_id", "team", "player_id", "x", "y")),
+        season_index
+    )
+    try:
+        write_coordinate_store(store, store_directory, source_hashes)
+        return open_coordinate_store(store_directory)
+    except (OSError, ValueError, KeyError):
+        return store
+
+def load_coordinate_store(directory: str, country: str, league: str, season: str) -> dict:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("coordinate_store",),
+        lambda: read_coordinate_store(directory, country, league, season),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def replace_labels(series, mapping):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).replace(mapping).astype("category")
+    return series.replace(mapping)
+
+SHOT_LABEL_TRANSLATIONS = {
+    "situation": change_situations,
+    "body_part": change_body_parts,
+    "goal_mouth_location": change_goal_locations,
+    "player_position": change_player_positions
+}
+
+def enrich_shots(shots_df: pd.DataFrame, match_dimension: pd.DataFrame) -> pd.DataFrame:
+    shots_df = build_shots_enriched(shots_df, match_dimension)
+    for column, translations in SHOT_LABEL_TRANSLATIONS.items():
+        shots_df[column] = replace_labels(shots_df[column], translations)
+    return shots_df
+
+def load_shots_enriched(directory: str, country: str, league: str, season: str) -> pd.DataFrame:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("shots_enriched",),
+        lambda: load_artifact_or_build(
+            directory, country, league, season, "shots_enriched",
+            lambda: add_player_codes(
+                enrich_shots(
+                    load_dataset(directory, country, league, season, "shots_data"),
+                    load_match_dimension(directory, country, league, season)
+                ),
+                load_season_index(directory, country, league, season)
+            )
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_scorelines(directory: str, country: str, league: str, season: str) -> pd.DataFrame:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("scorelines",),
+        lambda: load_artifact_or_build(
+            directory, country, league, season, "scorelines",
+            lambda: build_scorelines(
+                load_match_dimension(directory, country, league, season),
+                load_shots_enriched(directory, country, league, season)
+            )
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_match_stats_cube(directory: str, country: str, league: str, season: str) -> dict:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("match_stats_cube",),
+        lambda: load_artifact_or_build(
+            directory, country, league, season, "match_stats_cube",
+            lambda: build_match_stats_cube(
+                load_dataset(directory, country, league, season, "match_stats_data"),
+                load_match_dimension(directory, country, league, season)
+            )
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_player_match_matrix(directory: str, country: str, league: str, season: str) -> dict:
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("player_match_matrix",),
+        lambda: load_artifact_or_build(
+            directory, country, league, season, "player_match_matrix",
+            lambda: build_player_match_matrix(
+                read_dataset(directory, country, league, season, "lineups_data"),
+                load_match_dimension(directory, country, league, season),
+                load_season_index(directory, country, league, season)
+            )
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+def load_entity_rows(directory: str, country: str, league: str, season: str, source: str = "shots_enriched") -> dict:
+    # A team-sorted copy for per-team views; the source table keeps its row order.
+    return get_shared_table(
+        get_season_key(directory, country, league, season),
+        ("entity_rows", source),
+        lambda: build_entity_rows(
+            DATASET_LOADERS[source](directory, country, league, season),
+            len(load_season_index(directory, country, league, season)["teams"])
+        ),
+        version=get_season_version(directory, country, league, season)
+    )
+
+DATASET_LOADERS = {
+    "dataset": load_dataset,
+    "match_dimension": load_match_dimension,
+    "team_fact": load_team_fact_table,
+    "shots_enriched": load_shots_enriched,
+    "coordinate_store": load_coordinate_store,
+    "season_index": load_season_index,
+    "scorelines": load_scorelines,
+    "match_stats_cube": load_match_stats_cube,
+    "player_match_matrix": load_player_match_matrix,
+    "entity_rows": load_entity_rows
+}
+
+DATASET_LOADER_KINDS = {
+    "match_dimension": ("match_data",),
+    "shots_enriched": ("shots_data", "match_data"),
+    "coordinate_store": ("coordinates_data", "match_data", "lineups_data", "substitutions_data", "shots_data"),
+    "season_index": ("match_data", "lineups_data", "substitutions_data", "shots_data"),
+    "scorelines": ("match_data", "shots_data"),
+    "match_stats_cube": ("match_data", "match_stats_data"),
+    "player_match_matrix": ("match_data", "lineups_data", "substitutions_data", "shots_data")
+}
+
+def get_request_kinds(request: dict) -> tuple:
+    table = request.get("table", "dataset")
+    if table == "dataset":
+        return (request["kind"],)
+    if table == "team_fact":
+        return (request["kind"], "match_data")
+    if table == "entity_rows":
+        return DATASET_LOADER_KINDS[request.get("source", "shots_enriched")]
+    return DATASET_LOADER_KINDS[table]
+
+def warm_parquet_caches(directory: str, country: str, league: str, season: str, requests: list, max_workers: int) -> None:
+    cache_directory = get_cache_directory(directory)
+    jobs = set()
+    for request in requests:
+        for kind in get_request_kinds(request):
+            for file in get_season_files(directory, country, league, request.get("season", season), kind):
+                if needs_cache_build(file, cache_directory, kind):
+                    jobs.add((file, cache_directory, kind))
+    max_workers = min(max_workers, len(jobs))
+    if max_workers < 2:
+        return
+
+    # JSON parsing holds the GIL, so cold files are parsed in separate processes, largest first.
+    # Anything a worker fails to cache is built by the loaders below as usual.
+    jobs = sorted(jobs, key=lambda job: os.path.getsize(job[0]), reverse=True)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            list(executor.map(cache_json_file, jobs))
+    except Exception:
+        pass
+
+def load_request(directory: str, country: str, league: str, season: str, request: dict):
+    options = dict(request)
+    loader = DATASET_LOADERS[options.pop("table", "dataset")]
+    return loader(directory, country, league, options.pop("season", season), **options)
+
+def load_many(directory: str, country: str, league: str, season: str, requests: list, max_workers: int = DATASET_LOAD_WORKERS) -> list:
+    # Each request is {"kind": ...} for a dataset or {"table": ...} for a derived table, plus
+    # optional columns/filters and a "season" override for cross-season views.
+    max_workers = min(max_workers, len(requests), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [load_request(directory, country, league, season, request) for request in requests]
+
+    warm_parquet_caches(directory, country, league, season, requests, max_workers)
+
+    # Parquet reads release the GIL, so the cached files are read side by side.
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def run(request):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return load_request(directory, country, league, season, request)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, requests))
+
+# Tables most pages read first; warming them covers the first analysis of a session.
+PREFETCH_REQUESTS = [
+    {"kind": "match_data"},
+    {"kind": "shots_data"},
+    {"kind": "lineups_data"},
+    {"kind": "substitutions_data"},
+    {"kind": "match_stats_data"},
+    {"table": "match_dimension"},
+    {"table": "season_index"},
+    {"table": "shots_enriched"},
+    {"table": "scorelines"},
+    {"table": "match_stats_cube"},
+    {"table": "player_match_matrix"},
+    {"table": "coordinate_store"},
+    {"table": "entity_rows"}
+]
+
+PREFETCHES = {}
+PREFETCH_LOCK = threading.Lock()
+
+def run_prefetch(directory: str, country: str, league: str, season: str, status: dict) -> None:
+    try:
+        load_many(directory, country, league, season, PREFETCH_REQUESTS)
+        status["state"] = "ready"
+    except Exception as e:
+        status["error"] = str(e)
+        status["state"] = "failed"
+
+def start_prefetch(directory: str, country: str, league: str, season: str) -> dict:
+    # Sessions confirming a season that is already warming share its status instead of starting
+    # another thread; the loaders' build locks keep a table from being built twice either way.
+    season_key = get_season_key(directory, country, league, season)
+    with PREFETCH_LOCK:
+        status = PREFETCHES.get(season_key)
+        if status is not None and status["state"] == "running":
+            return status
+        status = {"league": league, "season": season, "state": "running", "error": None}
+        PREFETCHES[season_key] = status
+
+    thread = threading.Thread(
+        target=run_prefetch,
+        args=(directory, country, league, season, status),
+        name=f"prefetch_{league}_{season}",
+        daemon=True
+    )
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    thread.start()
+    return status
+
+def get_league_display(league: str) -> str:
+    return re.sub(r"\s+", "_", unidecode(league.lower()))
 
-    return pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame()
+def get_season_display(season: str) -> str:
+    return season.split('/')[0][2:] + season.split('/')[1]
 
 def get_user_selection(team_list_by_season, change_situations, change_body_parts, include_situation_type=True, include_team=True, include_body_part=True, key_prefix=""):
 
-    st.session_state["league_display"] = re.sub(r"\s+", "_", unidecode(st.session_state["selected_league"].lower()))
-    st.session_state["season_display"] = st.session_state["selected_season"].split('/')[0][2:] + st.session_state["selected_season"].split('/')[1]
+    st.session_state["league_display"] = get_league_display(st.session_state["selected_league"])
+    st.session_state["season_display"] = get_season_display(st.session_state["selected_season"])
 
     team = None
     if include_team:
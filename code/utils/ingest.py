@@ -0,0 +1,190 @@
+import os
+import shutil
+import threading
+import pandas as pd
+from code.utils.dataset_store import clear_season, get_season_key, get_season_tables, get_stored_version, replace_season_tables
+from code.utils.derived_tables import attach_match_teams, build_match_dimension, build_scorelines
+from code.utils.helpers import enrich_shots, get_dataset_version, read_dataset
+from code.utils.interning import add_player_codes, build_name_index, build_season_index, is_same_index, reintern_table
+from code.utils.parquet_cache import DELTA_WEEK_PATTERN, filter_frame, get_cache_directory, get_part_order, load_cached_json_file
+from code.utils.schemas import apply_schema
+
+def get_delta_file_path(directory: str, country: str, league: str, season: str, kind: str, week: int, extension: str = ".json.gz") -> str:
+    return os.path.join(directory, kind, f"sofascore_{country}_{league}_{season}_{kind}_week_{int(week)}{extension}")
+
+def place_delta_file(source_file: str, directory: str, country: str, league: str, season: str, kind: str, week: int) -> str:
+    extension = ".json.gz" if source_file.endswith(".gz") else ".json"
+    raw_file = get_delta_file_path(directory, country, league, season, kind, week, extension)
+    os.makedirs(os.path.dirname(raw_file), exist_ok=True)
+
+    # The dot prefix keeps a half-copied file out of the season file glob.
+    temp_path = os.path.join(os.path.dirname(raw_file), f".{os.path.basename(raw_file)}.tmp")
+    shutil.copyfile(source_file, temp_path)
+    os.replace(temp_path, raw_file)
+    return raw_file
+
+def combine_games(existing: pd.DataFrame, addition: pd.DataFrame, game_ids) -> pd.DataFrame:
+    if game_ids is None:
+        return addition
+    if "game_id" in existing.columns:
+        existing = existing[~existing["game_id"].isin(game_ids)]
+    combined = pd.concat([existing, addition], ignore_index=True)
+
+    # concat falls back to object when the two sides' categories differ. The table keeps its
+    # categories plus the delta's values, sorted like the categories of a fresh build.
+    for column in existing.columns:
+        if not isinstance(existing[column].dtype, pd.CategoricalDtype) or isinstance(combined[column].dtype, pd.CategoricalDtype):
+            continue
+        categories = set(existing[column].cat.categories)
+        if column in addition.columns:
+            categories.update(addition[column].dropna().unique())
+        combined[column] = combined[column].astype(pd.CategoricalDtype(sorted(categories)))
+    return combined
+
+def update_season_tables(directory: str, country: str, league: str, season: str, kind: str, delta_df: pd.DataFrame) -> None:
+    season_key = get_season_key(directory, country, league, season)
+    tables = get_season_tables(season_key)
+    if not tables or delta_df.empty:
+        return
+
+    game_ids = delta_df["game_id"].unique().tolist() if "game_id" in delta_df.columns else None
+    match_dimension = tables.get(("match_dimension",))
+    season_index = tables.get(("season_index",))
+    updates = {}
+
+    if kind in ("match_data", "lineups_data", "substitutions_data", "shots_data") and season_index is not None:
+        season_index = build_season_index(
+            read_dataset(directory, country, league, season, "match_data", columns=("home_team", "away_team")),
+            read_dataset(directory, country, league, season, "lineups_data", columns=("player_id", "player_name")),
+            read_dataset(directory, country, league, season, "substitutions_data", columns=("player_in", "player_in_id", "player_out", "player_out_id")),
+            read_dataset(directory, country, league, season, "shots_data", columns=("player_id", "player_name"))
+        )
+
+    if kind == "match_data" and match_dimension is not None:
+        # Team codes stay season-wide, so they are interned against every fixture, not just the delta's.
+        fixtures = read_dataset(directory, country, league, season, "match_data", columns=("home_team", "away_team"))
+        teams = build_name_index(fixtures["home_team"], fixtures["away_team"])
+        match_dimension = combine_games(match_dimension, build_match_dimension(delta_df, teams), game_ids)
+        updates[("match_dimension",)] = match_dimension
+
+    # Only the delta's games are rebuilt. A match_data delta can end games whose facts
+    # arrived earlier, so those are reread from the cache for just those games.
+    for table_key, value in tables.items():
+        if table_key[0] == "dataset" and table_key[1] == kind:
+            columns, filters = table_key[2], dict(table_key[3])
+            if game_ids is not None and columns is not None and "game_id" not in columns:
+                updates[table_key] = None
+            else:
+                updates[table_key] = apply_schema(combine_games(value, filter_frame(delta_df, columns, filters), game_ids), kind)
+
+        elif table_key[0] == "team_fact" and kind in (table_key[1], "match_data"):
+            fact_kind, columns, filters = table_key[1], table_key[2], dict(table_key[3])
+            if match_dimension is None or season_index is None or game_ids is None:
+                updates[table_key] = None
+                continue
+            if fact_kind == kind:
+                fact_df = filter_frame(delta_df, columns, filters)
+            else:
+                fact_df = read_dataset(directory, country, league, season, fact_kind, columns=columns, filters={**filters, "game_id": tuple(game_ids)})
+            fact_df = add_player_codes(attach_match_teams(fact_df, match_dimension), season_index)
+            updates[table_key] = apply_schema(combine_games(value, fact_df, game_ids), fact_kind)
+
+        elif table_key[0] == "shots_enriched" and kind in ("shots_data", "match_data"):
+            if match_dimension is None or season_index is None or game_ids is None:
+                updates[table_key] = None
+                continue
+            if kind == "shots_data":
+                shots_df = delta_df
+            else:
+                shots_df = read_dataset(directory, country, league, season, "shots_data", filters={"game_id": tuple(game_ids)})
+            shots_df = add_player_codes(enrich_shots(shots_df, match_dimension), season_index)
+            updates[table_key] = apply_schema(combine_games(value, shots_df, game_ids), "shots_data")
+
+        elif table_key[0] == "match_stats_cube" and kind in ("match_stats_data", "match_data"):
+            # The cube is small enough to rebuild from the updated long table on next use.
+            updates[table_key] = None
+
+        elif table_key[0] == "player_match_matrix" and kind in ("lineups_data", "match_data", "substitutions_data"):
+            updates[table_key] = None
+
+        elif table_key[0] == "coordinate_store" and kind == "coordinates_data":
+            # Rebuilt lazily from the cached parquet parts; no JSON is reparsed.
+            updates[table_key] = None
+
+    if ("scorelines",) in tables and kind in ("shots_data", "match_data"):
+        shots_df = updates.get(("shots_enriched",), tables.get(("shots_enriched",)))
+        if match_dimension is None or shots_df is None or game_ids is None:
+            updates[("scorelines",)] = None
+        else:
+            scorelines = build_scorelines(
+                match_dimension[match_dimension["game_id"].isin(game_ids)],
+                shots_df[shots_df["game_id"].isin(game_ids)]
+            )
+            updates[("scorelines",)] = combine_games(tables[("scorelines",)], scorelines, game_ids)
+
+    if season_index is not None and not is_same_index(tables[("season_index",)], season_index):
+        updates[("season_index",)] = season_index
+        for table_key, value in tables.items():
+            value = updates.get(table_key, value)
+            if isinstance(value, pd.DataFrame):
+                updates[table_key] = reintern_table(value.copy(deep=False), season_index)
+            elif table_key[0] in ("player_match_matrix", "coordinate_store"):
+                # Both are laid out by player code, so they are rebuilt rather than recoded.
+                updates[table_key] = None
+
+    # Team-sorted copies follow their source table, including a reinterned one.
+    for table_key in tables:
+        if table_key[0] == "entity_rows" and (table_key[1],) in updates:
+            updates[table_key] = None
+
+    replace_season_tables(season_key, updates, version=get_dataset_version(directory, country, league, season))
+
+def apply_delta_file(raw_file: str, directory: str, country: str, league: str, season: str, kind: str) -> pd.DataFrame:
+    delta_df = load_cached_json_file(raw_file, get_cache_directory(directory), kind)
+    update_season_tables(directory, country, league, season, kind, delta_df)
+    return delta_df
+
+def ingest_delta_file(source_file: str, directory: str, country: str, league: str, season: str, kind: str, week: int) -> pd.DataFrame:
+    raw_file = place_delta_file(source_file, directory, country, league, season, kind, week)
+    return apply_delta_file(raw_file, directory, country, league, season, kind)
+
+# The manifest each season's shared tables were last seen with, so a new version can be
+# told apart from a weekly drop of delta files.
+SEASON_MANIFESTS = {}
+SEASON_MANIFESTS_LOCK = threading.Lock()
+
+def get_new_delta_files(previous_manifest: dict, manifest: dict):
+    # Returns (kind, file name) for every new _week_N part, or None if anything else changed.
+    if previous_manifest["schema_version"] != manifest["schema_version"] or previous_manifest["derived_version"] != manifest["derived_version"]:
+        return None
+    delta_files = []
+    for kind, files in manifest["files"].items():
+        previous_files = {tuple(file) for file in previous_manifest["files"].get(kind, [])}
+        current_files = {tuple(file) for file in files}
+        if not previous_files <= current_files:
+            return None
+        for file_name, _ in current_files - previous_files:
+            if not DELTA_WEEK_PATTERN.search(file_name):
+                return None
+            delta_files.append((kind, file_name))
+    # Fixtures first, so the other deltas find their games already in the match dimension.
+    return sorted(delta_files, key=lambda delta: (delta[0] != "match_data", delta[0], get_part_order(delta[1])))
+
+def sync_season_deltas(directory: str, country: str, league: str, season: str, manifest: dict, version: str) -> None:
+    season_key = get_season_key(directory, country, league, season)
+    with SEASON_MANIFESTS_LOCK:
+        previous = SEASON_MANIFESTS.get(season_key)
+        SEASON_MANIFESTS[season_key] = (version, manifest)
+        stored_version = get_stored_version(season_key)
+        if previous is None or stored_version is None or stored_version == version or previous[0] != stored_version:
+            return
+
+        delta_files = get_new_delta_files(previous[1], manifest)
+        if delta_files is None:
+            # Changed or removed files: the store drops the season and it is rebuilt.
+            return
+        try:
+            for kind, file_name in delta_files:
+                apply_delta_file(os.path.join(directory, kind, file_name), directory, country, league, season, kind)
+        except Exception:
+            clear_season(season_key)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+def build_name_index(*columns) -> pd.Index:
+    names = pd.unique(np.concatenate([np.asarray(column, dtype=object) for column in columns]))
+    return pd.Index(sorted(name for name in names if isinstance(name, str)), dtype=object)
+
+def intern_names(values, index: pd.Index) -> np.ndarray:
+    # Unknown or missing names get -1.
+    return index.get_indexer(np.asarray(values, dtype=object)).astype("int32")
+
+def get_names(codes, index: pd.Index) -> np.ndarray:
+    codes = np.asarray(codes)
+    names = np.append(index.to_numpy(dtype=object), None)
+    return names[np.where(codes >= 0, codes, len(index))]
+
+def build_player_index(*frames) -> dict:
+    # Players are identified by the SofaScore player_id; the first name seen is kept for display.
+    players = pd.concat(
+        [frame[[id_column, name_column]].set_axis(["player_id", "player_name"], axis=1) for frame, id_column, name_column in frames],
+        ignore_index=True
+    )
+    players = players.dropna().astype({"player_name": object}).drop_duplicates(subset="player_id").sort_values("player_id")
+    return {
+        "ids": pd.Index(players["player_id"].to_numpy(dtype="int64")),
+        "names": players["player_name"].to_numpy(dtype=object)
+    }
+
+def build_season_index(match_data_df: pd.DataFrame, lineups_df: pd.DataFrame, substitutions_df: pd.DataFrame, shots_df: pd.DataFrame) -> dict:
+    # Shooters are included too; a few have shots but no lineup entry.
+    frames = [(lineups_df, "player_id", "player_name")]
+    if not substitutions_df.empty:
+        frames += [(substitutions_df, "player_in_id", "player_in"), (substitutions_df, "player_out_id", "player_out")]
+    if not shots_df.empty:
+        frames += [(shots_df, "player_id", "player_name")]
+    return {
+        "teams": build_name_index(match_data_df["home_team"], match_data_df["away_team"]),
+        "players": build_player_index(*frames)
+    }
+
+def get_team_code(season_index: dict, team: str) -> int:
+    return int(intern_names([team], season_index["teams"])[0])
+
+def get_player_codes(season_index: dict, player_name: str) -> np.ndarray:
+    # Every player shown under this name; namesakes at different clubs share one.
+    return np.flatnonzero(season_index["players"]["names"] == player_name).astype("int32")
+
+def get_player_names(season_index: dict, player_codes) -> np.ndarray:
+    player_codes = np.asarray(player_codes)
+    names = np.append(season_index["players"]["names"], None)
+    return names[np.where(player_codes >= 0, player_codes, len(names) - 1)]
+
+def add_player_codes(fact_df: pd.DataFrame, season_index: dict) -> pd.DataFrame:
+    if "player_id" in fact_df.columns:
+        fact_df["player_code"] = season_index["players"]["ids"].get_indexer(fact_df["player_id"].to_numpy()).astype("int32")
+    return fact_df
+
+def is_same_index(season_index: dict, other: dict) -> bool:
+    return season_index["teams"].equals(other["teams"]) and season_index["players"]["ids"].equals(other["players"]["ids"])
+
+def reintern_table(df: pd.DataFrame, season_index: dict) -> pd.DataFrame:
+    # Dense codes follow sorted names and ids, so a new team or player shifts them.
+    teams = season_index["teams"]
+    for code_column, name_column in [
+        ("home_team_code", "home_team"),
+        ("away_team_code", "away_team"),
+        ("team_code", "team_name"),
+        ("opponent_code", "opponent_name")
+    ]:
+        if code_column in df.columns:
+            df[code_column] = intern_names(df[name_column], teams)
+    if "player_code" in df.columns:
+        df = add_player_codes(df, season_index)
+    return df
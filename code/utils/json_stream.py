@@ -0,0 +1,162 @@
+import gzip
+import json
+import numpy as np
+import pandas as pd
+from code.utils.schemas import MISSING_INTEGER_DTYPE
+
+STREAM_READ_SIZE = 1 << 20
+STREAM_BATCH_ROWS = 1 << 14
+STREAM_INITIAL_ROWS = 1 << 16
+WHITESPACE = " \t\n\r"
+
+def open_json_text(raw_file: str):
+    if raw_file.endswith(".gz"):
+        return gzip.open(raw_file, "rt", encoding="utf-8")
+    return open(raw_file, encoding="utf-8")
+
+def iter_json_array_batches(raw_file: str, batch_rows: int = STREAM_BATCH_ROWS, read_size: int = STREAM_READ_SIZE):
+    decoder = json.JSONDecoder()
+    with open_json_text(raw_file) as f:
+        buffer = ""
+        position = 0
+        is_started = False
+        batch = []
+
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+
+            if position >= len(buffer):
+                buffer = f.read(read_size)
+                position = 0
+                if not buffer:
+                    raise ValueError(f"Unexpected end of JSON array in {raw_file}")
+                continue
+
+            if not is_started:
+                if buffer[position] != "[":
+                    raise ValueError(f"Expected a JSON array in {raw_file}")
+                is_started = True
+                position += 1
+                continue
+
+            if buffer[position] == ",":
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                if batch:
+                    yield batch
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                chunk = f.read(read_size)
+                if not chunk:
+                    raise
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            batch.append(record)
+            position = end
+            if len(batch) >= batch_rows:
+                yield batch
+                batch = []
+                buffer = buffer[position:]
+                position = 0
+
+def new_column(dtype: str, capacity: int) -> dict:
+    if dtype == "category":
+        return {"dtype": dtype, "values": np.empty(capacity, dtype="int32"), "lookup": {}}
+    if dtype is None:
+        return {"dtype": dtype, "values": np.empty(capacity, dtype=object)}
+    return {"dtype": dtype, "values": np.empty(capacity, dtype=dtype)}
+
+def to_object_array(values: list) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+def widen_column(column: dict, dtype) -> None:
+    column["dtype"] = dtype
+    column["values"] = column["values"].astype(dtype or object)
+
+def to_column_values(column: dict, values: list) -> np.ndarray:
+    dtype = column["dtype"]
+    if dtype == "category":
+        lookup = column["lookup"]
+        return np.fromiter((lookup.setdefault(value, len(lookup)) for value in values), dtype="int32", count=len(values))
+    if dtype is None:
+        return to_object_array(values)
+
+    if dtype.startswith("float") or None not in values:
+        try:
+            return np.asarray(values, dtype=dtype)
+        except (TypeError, ValueError):
+            pass
+
+    # Missing values widen integers like apply_schema does; anything non-numeric
+    # (e.g. "" in unplayed match scores) is left for normalize_mixed_columns.
+    if dtype != "bool":
+        try:
+            array = np.asarray(values, dtype="float64").astype(MISSING_INTEGER_DTYPE)
+            widen_column(column, MISSING_INTEGER_DTYPE)
+            return array
+        except (TypeError, ValueError):
+            pass
+    widen_column(column, None)
+    return to_object_array(values)
+
+def backfill_column(column: dict, rows: int) -> None:
+    # A key first seen after earlier records: those records are missing it.
+    if column["dtype"] == "category":
+        column["values"][:rows] = column["lookup"].setdefault(None, len(column["lookup"]))
+    else:
+        dtype = column["dtype"]
+        widen_column(column, None if dtype in (None, "bool") else dtype if dtype.startswith("float") else MISSING_INTEGER_DTYPE)
+        column["values"][:rows] = None if column["dtype"] is None else np.nan
+
+def finish_column(column: dict, rows: int):
+    values = column["values"]
+    values.resize(rows, refcheck=False)
+
+    if column["dtype"] is None:
+        return pd.Series(values).infer_objects()
+    if column["dtype"] != "category":
+        return values
+
+    lookup = column["lookup"]
+    remap = np.full(len(lookup), -1, dtype="int32")
+    lookup.pop(None, None)
+    categories = sorted(lookup)
+    for new_code, category in enumerate(categories):
+        remap[lookup[category]] = new_code
+    return pd.Categorical.from_codes(remap[values], categories=categories)
+
+def read_json_array_columns(raw_file: str, schema: dict, batch_rows: int = STREAM_BATCH_ROWS) -> pd.DataFrame:
+    capacity = STREAM_INITIAL_ROWS
+    columns = {}
+    rows = 0
+
+    for batch in iter_json_array_batches(raw_file, batch_rows=batch_rows):
+        for record in batch:
+            for key in record:
+                if key not in columns:
+                    columns[key] = new_column(schema.get(key), capacity)
+                    if rows:
+                        backfill_column(columns[key], rows)
+
+        size = len(batch)
+        if rows + size > capacity:
+            while rows + size > capacity:
+                capacity *= 2
+            for column in columns.values():
+                column["values"].resize(capacity, refcheck=False)
+
+        for key, column in columns.items():
+            column["values"][rows:rows + size] = to_column_values(column, [record.get(key) for record in batch])
+        rows += size
+
+    return pd.DataFrame({key: finish_column(column, rows) for key, column in columns.items()})
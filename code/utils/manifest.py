@@ -0,0 +1,40 @@
+import hashlib
+import json
+import os
+from code.utils.parquet_cache import file_fingerprint, file_sha256, get_cache_paths, read_cache_meta
+from code.utils.schemas import SCHEMA_VERSION
+
+# Bump when a derived table or cached computation changes, so results keyed on an
+# older manifest are not served again.
+DERIVED_TABLE_VERSION = 5
+
+FILE_HASHES = {}
+
+def get_file_hash(raw_file: str, cache_directory: str, subdirectory: str) -> str:
+    fingerprint = file_fingerprint(raw_file)
+    key = (raw_file, fingerprint["size"], fingerprint["mtime_ns"])
+    if key in FILE_HASHES:
+        return FILE_HASHES[key]
+
+    # The parquet cache already recorded the content hash for an unchanged file.
+    meta = read_cache_meta(get_cache_paths(raw_file, cache_directory, subdirectory)[1])
+    if meta and meta.get("sha256") and meta.get("size") == fingerprint["size"] and meta.get("mtime_ns") == fingerprint["mtime_ns"]:
+        sha256 = meta["sha256"]
+    else:
+        sha256 = file_sha256(raw_file)
+
+    FILE_HASHES[key] = sha256
+    return sha256
+
+def build_manifest(files_by_kind: dict, cache_directory: str) -> dict:
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "derived_version": DERIVED_TABLE_VERSION,
+        "files": {
+            kind: [[os.path.basename(file), get_file_hash(file, cache_directory, kind)] for file in files]
+            for kind, files in sorted(files_by_kind.items())
+        }
+    }
+
+def get_manifest_token(manifest: dict) -> str:
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:16]
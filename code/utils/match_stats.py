@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+from code.utils.interning import build_name_index, get_names, intern_names
+
+# SofaScore writes match stats as "56%", "1.72" or "12/30 (40%)".
+MATCH_STATS_VALUE_PATTERN = r"^\s*(?P<number>-?\d+(?:\.\d+)?)\s*(?P<percent>%)?\s*(?:/\s*(?P<total>\d+))?"
+
+MATCH_STATS_SIDES = {
+    "home": "home_team_stat",
+    "away": "away_team_stat"
+}
+
+MATCH_STATS_VALUE_COLUMNS = [f"{side}_{field}" for side in MATCH_STATS_SIDES for field in ("value", "success", "total", "ratio")]
+
+MATCH_STATS_CUBE_FIELDS = ("value", "success", "total")
+
+def parse_match_stats_values(match_stats_df: pd.DataFrame) -> pd.DataFrame:
+    # value holds single numbers and percentages; success/total stats get success, total and
+    # their ratio (in percent) instead.
+    for side, column in MATCH_STATS_SIDES.items():
+        if column not in match_stats_df.columns:
+            continue
+        parts = match_stats_df[column].astype("string").str.extract(MATCH_STATS_VALUE_PATTERN)
+        number = pd.to_numeric(parts["number"]).astype("float64")
+        total = pd.to_numeric(parts["total"]).astype("float64")
+        is_fraction = total.notna()
+
+        match_stats_df[f"{side}_value"] = number.where(~is_fraction)
+        match_stats_df[f"{side}_success"] = number.where(is_fraction)
+        match_stats_df[f"{side}_total"] = total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            match_stats_df[f"{side}_ratio"] = np.where(
+                is_fraction,
+                (number / total.where(total != 0)) * 100,
+                number.where(parts["percent"].notna())
+            )
+    return match_stats_df
+
+def build_match_stats_cube(match_stats_df: pd.DataFrame, match_dimension: pd.DataFrame) -> dict:
+    fixtures = match_dimension.drop_duplicates(subset="game_id").set_index("game_id")
+    match_stats_df = match_stats_df[match_stats_df["game_id"].isin(fixtures.index)]
+
+    periods = pd.Index(pd.unique(match_stats_df["period"].astype(object)))
+    game_ids = pd.Index(pd.unique(match_stats_df["game_id"]))
+    stat_keys = match_stats_df[["group_name", "stat_name"]].astype(object)
+    stats = pd.MultiIndex.from_frame(stat_keys.drop_duplicates())
+
+    period_codes = periods.get_indexer(match_stats_df["period"].astype(object))
+    game_codes = game_ids.get_indexer(match_stats_df["game_id"])
+    stat_codes = stats.get_indexer(pd.MultiIndex.from_frame(stat_keys))
+
+    # Axes: period, game, side (home, away), stat, field (value, success, total).
+    values = np.full((len(periods), len(game_ids), len(MATCH_STATS_SIDES), len(stats), len(MATCH_STATS_CUBE_FIELDS)), np.nan)
+    for side_code, side in enumerate(MATCH_STATS_SIDES):
+        columns = [f"{side}_{field}" for field in MATCH_STATS_CUBE_FIELDS]
+        values[period_codes, game_codes, side_code, stat_codes] = match_stats_df[columns].to_numpy(dtype="float64")
+    present = np.zeros((len(periods), len(game_ids), len(stats)), dtype=bool)
+    present[period_codes, game_codes, stat_codes] = True
+
+    fixtures = fixtures.reindex(game_ids)
+    home_team = fixtures["home_team"].to_numpy(dtype=object)
+    away_team = fixtures["away_team"].to_numpy(dtype=object)
+    teams = build_name_index(home_team, away_team)
+
+    return {
+        "values": values,
+        "present": present,
+        "periods": periods,
+        "game_ids": game_ids.to_numpy(),
+        "weeks": fixtures["week"].to_numpy(),
+        "group_names": stats.get_level_values(0).to_numpy(dtype=object),
+        "stat_names": stats.get_level_values(1).to_numpy(dtype=object),
+        "teams": teams,
+        "team_codes": np.column_stack([intern_names(home_team, teams), intern_names(away_team, teams)])
+    }
+
+def get_cube_field(cube: dict, period: str, field: str) -> np.ndarray:
+    # [n_games, 2, n_stats]; "ratio" is success over total in percent.
+    values = cube["values"][cube["periods"].get_loc(period)]
+    if field != "ratio":
+        return values[..., MATCH_STATS_CUBE_FIELDS.index(field)]
+    total = values[..., MATCH_STATS_CUBE_FIELDS.index("total")]
+    return values[..., MATCH_STATS_CUBE_FIELDS.index("success")] / np.where(total != 0, total, np.nan) * 100
+
+def reduce_by_team(cube: dict, values: np.ndarray, reduction: str = "sum", opponent: bool = False) -> np.ndarray:
+    # [n_teams, n_stats]; missing values are skipped like a pandas groupby does.
+    if opponent:
+        values = values[:, ::-1]
+    team_codes = cube["team_codes"].reshape(-1)
+    values = values.reshape(len(team_codes), -1)
+    is_known = ~np.isnan(values)
+
+    totals = np.zeros((len(cube["teams"]), values.shape[1]))
+    np.add.at(totals, team_codes, np.where(is_known, values, 0))
+    if reduction == "sum":
+        return totals
+
+    counts = np.zeros_like(totals)
+    np.add.at(counts, team_codes, is_known)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return totals / counts
+
+def get_match_stats_frame(cube: dict, period: str) -> pd.DataFrame:
+    # One row per stat, side and game that has the stat, stat-major like the source rows.
+    values = cube["values"][cube["periods"].get_loc(period)].transpose(2, 1, 0, 3)
+    present = np.broadcast_to(cube["present"][cube["periods"].get_loc(period)].T[:, None, :], values.shape[:3])
+    stat_codes, side_codes, game_codes = np.nonzero(present)
+    rows = values[stat_codes, side_codes, game_codes]
+
+    return pd.DataFrame({
+        "game_id": cube["game_ids"][game_codes],
+        "team_name": get_names(cube["team_codes"][game_codes, side_codes], cube["teams"]),
+        "group_name": cube["group_names"][stat_codes],
+        "stat_name": cube["stat_names"][stat_codes],
+        **{f"stat_{field}": rows[:, code] for code, field in enumerate(MATCH_STATS_CUBE_FIELDS)}
+    })
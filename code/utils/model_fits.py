@@ -0,0 +1,46 @@
+import glob
+import os
+import re
+from code.utils.parquet_cache import get_cache_directory, read_cache_meta, write_cache_meta
+
+FIT_WEEK_PATTERN = re.compile(r"_week_(\d+)\.json$")
+
+def get_model_fit_directory(raw_directory: str, country: str, league: str, season: str) -> str:
+    return os.path.join(get_cache_directory(raw_directory), "model_fits", f"sofascore_{country}_{league}_{season}")
+
+def get_fit_name(model: str, options: dict) -> str:
+    return "_".join([model] + [f"{key}_{value:g}" for key, value in sorted(options.items())])
+
+def get_fit_path(fit_directory: str, model: str, options: dict, week: int) -> str:
+    return os.path.join(fit_directory, f"{get_fit_name(model, options)}_week_{int(week)}.json")
+
+def find_previous_fit(fit_directory: str, model: str, options: dict, week: int):
+    # The latest stored fit up to this week; a mid-round fit of the same week counts too.
+    weeks = []
+    for path in glob.glob(os.path.join(fit_directory, f"{get_fit_name(model, options)}_week_*.json")):
+        match = FIT_WEEK_PATTERN.search(path)
+        if match and int(match.group(1)) <= week:
+            weeks.append((int(match.group(1)), path))
+    for _, path in sorted(weeks, reverse=True):
+        fit = read_cache_meta(path)
+        if fit is not None and fit.get("model") == model and fit.get("options") == options:
+            return fit
+    return None
+
+def load_or_fit(fit_directory: str, model: str, options: dict, week: int, version: str, fit) -> dict:
+    # Fits are stored per (model, options, last completed week). The same data is served as
+    # stored; otherwise the closest earlier fit is passed to `fit` as its starting point.
+    previous = find_previous_fit(fit_directory, model, options, week)
+    if previous is not None and previous["week"] == week and previous["version"] == version:
+        return previous["params"]
+
+    params = fit(None if previous is None else previous["params"])
+    try:
+        os.makedirs(fit_directory, exist_ok=True)
+        write_cache_meta(
+            get_fit_path(fit_directory, model, options, week),
+            {"model": model, "options": options, "week": int(week), "version": version, "params": params}
+        )
+    except OSError:
+        pass
+    return params
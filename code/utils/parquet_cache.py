@@ -0,0 +1,216 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import pandas as pd
+from code.utils.json_stream import read_json_array_columns
+from code.utils.match_stats import parse_match_stats_values
+from code.utils.schemas import DATASET_SCHEMAS, SCHEMA_VERSION, apply_schema
+
+CACHE_FORMAT_VERSION = 3
+CACHE_ROW_GROUP_SIZE = 16384
+
+# Large per-event datasets are parsed incrementally instead of through pd.read_json.
+STREAMED_DATASETS = {"coordinates_data", "lineups_data"}
+
+# Rows are clustered on these keys so filtered reads can skip whole row groups.
+CACHE_SORT_KEYS = {
+    "coordinates_data": ["player_name", "game_id"]
+}
+
+# Numeric columns derived from raw strings once, when a file is cached.
+DATASET_PARSERS = {
+    "match_stats_data": parse_match_stats_values
+}
+
+# Weekly deltas sit next to the season file as ..._{kind}_week_{week}.json[.gz].
+DELTA_WEEK_PATTERN = re.compile(r"_week_(\d+)\.json")
+
+def get_part_order(raw_file: str) -> tuple:
+    match = DELTA_WEEK_PATTERN.search(os.path.basename(raw_file))
+    return (1, int(match.group(1))) if match else (0, 0)
+
+def drop_superseded_rows(dataframes: list) -> list:
+    # A later part wins for every game it contains; parts without games replace earlier ones.
+    kept = []
+    later_game_ids = set()
+    for df in reversed(dataframes):
+        if "game_id" not in df.columns:
+            if not kept:
+                kept.append(df)
+            continue
+        if later_game_ids:
+            df = df[~df["game_id"].isin(later_game_ids)]
+        later_game_ids.update(df["game_id"].unique().tolist())
+        kept.append(df)
+    return kept[::-1]
+
+def get_cache_directory(raw_directory: str) -> str:
+    return os.path.normpath(os.path.join(raw_directory, os.pardir, "cache"))
+
+def get_cache_paths(raw_file: str, cache_directory: str, subdirectory: str) -> tuple:
+    base_name = os.path.basename(raw_file).split(".json")[0]
+    target_directory = os.path.join(cache_directory, subdirectory)
+    return (
+        os.path.join(target_directory, f"{base_name}.parquet"),
+        os.path.join(target_directory, f"{base_name}.meta.json")
+    )
+
+def file_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_raw_json_file(raw_file: str, subdirectory: str = None) -> pd.DataFrame:
+    if subdirectory in STREAMED_DATASETS:
+        return read_json_array_columns(raw_file, DATASET_SCHEMAS[subdirectory])
+    if raw_file.endswith(".gz"):
+        with gzip.open(raw_file, "rt", encoding="utf-8") as f:
+            return pd.read_json(f)
+    return pd.read_json(raw_file)
+
+def read_raw_frame(raw_file: str, subdirectory: str) -> pd.DataFrame:
+    df = normalize_mixed_columns(read_raw_json_file(raw_file, subdirectory))
+    if subdirectory in DATASET_PARSERS and not df.empty:
+        df = DATASET_PARSERS[subdirectory](df)
+    return apply_schema(df, subdirectory)
+
+def normalize_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Unplayed matches carry "" in otherwise integer score and injury time fields.
+    for column in df.columns[df.dtypes == object]:
+        values = df[column].dropna()
+        values = values[values != ""]
+        if values.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)).all():
+            df[column] = pd.to_numeric(df[column].replace("", None), errors="coerce")
+    return df
+
+def read_cache_meta(meta_path: str):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cache_meta(meta_path: str, meta: dict) -> None:
+    temp_path = f"{meta_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temp_path, meta_path)
+
+def write_cache_frame(df: pd.DataFrame, parquet_path: str, meta_path: str, meta: dict) -> bool:
+    try:
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        temp_path = f"{parquet_path}.tmp"
+        df.to_parquet(temp_path, index=False, row_group_size=CACHE_ROW_GROUP_SIZE)
+        os.replace(temp_path, parquet_path)
+        write_cache_meta(meta_path, meta)
+        return True
+    except (ImportError, OSError, ValueError):
+        return False
+
+def is_cache_valid(raw_file: str, parquet_path: str, meta: dict, fingerprint: dict):
+    if (
+        meta is None or
+        meta.get("format_version") != CACHE_FORMAT_VERSION or
+        meta.get("schema_version") != SCHEMA_VERSION or
+        not os.path.exists(parquet_path)
+    ):
+        return False, None
+    if meta.get("size") == fingerprint["size"] and meta.get("mtime_ns") == fingerprint["mtime_ns"]:
+        return True, meta.get("sha256")
+
+    # Checkouts and copies touch mtime without changing content, so fall back to the hash.
+    sha256 = file_sha256(raw_file)
+    return meta.get("sha256") == sha256, sha256
+
+def sort_for_cache(df: pd.DataFrame, subdirectory: str) -> pd.DataFrame:
+    sort_keys = [column for column in CACHE_SORT_KEYS.get(subdirectory, []) if column in df.columns]
+    if not sort_keys:
+        return df
+    return df.sort_values(sort_keys, kind="stable").reset_index(drop=True)
+
+def build_parquet_filters(filters: dict) -> list:
+    parquet_filters = []
+    for column, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            parquet_filters.append((column, "in", list(value)))
+        else:
+            parquet_filters.append((column, "==", value))
+    return parquet_filters
+
+def filter_frame(df: pd.DataFrame, columns=None, filters=None) -> pd.DataFrame:
+    if filters:
+        mask = pd.Series(True, index=df.index)
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple, set)):
+                mask &= df[column].isin(list(value))
+            else:
+                mask &= df[column] == value
+        df = df[mask].reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+def ensure_cached_json_file(raw_file: str, cache_directory: str, subdirectory: str):
+    parquet_path, meta_path = get_cache_paths(raw_file, cache_directory, subdirectory)
+    fingerprint = file_fingerprint(raw_file)
+    meta = read_cache_meta(meta_path)
+
+    is_valid, sha256 = is_cache_valid(raw_file, parquet_path, meta, fingerprint)
+    if is_valid:
+        if meta.get("size") != fingerprint["size"] or meta.get("mtime_ns") != fingerprint["mtime_ns"]:
+            try:
+                write_cache_meta(meta_path, {**meta, **fingerprint})
+            except OSError:
+                pass
+        return parquet_path, None
+
+    df = sort_for_cache(read_raw_frame(raw_file, subdirectory), subdirectory)
+    is_written = write_cache_frame(
+        df,
+        parquet_path,
+        meta_path,
+        {
+            **fingerprint,
+            "sha256": sha256 or file_sha256(raw_file),
+            "format_version": CACHE_FORMAT_VERSION,
+            "schema_version": SCHEMA_VERSION,
+            "rows": len(df)
+        }
+    )
+    return (parquet_path if is_written else None), df
+
+def needs_cache_build(raw_file: str, cache_directory: str, subdirectory: str) -> bool:
+    parquet_path, meta_path = get_cache_paths(raw_file, cache_directory, subdirectory)
+    return not is_cache_valid(raw_file, parquet_path, read_cache_meta(meta_path), file_fingerprint(raw_file))[0]
+
+def cache_json_file(job: tuple) -> bool:
+    raw_file, cache_directory, subdirectory = job
+    return ensure_cached_json_file(raw_file, cache_directory, subdirectory)[0] is not None
+
+def load_cached_json_file(raw_file: str, cache_directory: str, subdirectory: str, columns=None, filters=None) -> pd.DataFrame:
+    parquet_path, df = ensure_cached_json_file(raw_file, cache_directory, subdirectory)
+
+    if df is None:
+        try:
+            return pd.read_parquet(
+                parquet_path,
+                columns=list(columns) if columns is not None else None,
+                filters=build_parquet_filters(filters) if filters else None
+            )
+        except (ImportError, OSError, ValueError, TypeError):
+            pass
+
+        try:
+            df = pd.read_parquet(parquet_path)
+        except (ImportError, OSError, ValueError):
+            df = read_raw_frame(raw_file, subdirectory)
+
+    return filter_frame(df, columns, filters)
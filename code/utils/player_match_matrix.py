@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from code.utils.derived_tables import attach_match_teams
+from code.utils.entity_index import add_entity_offsets, get_code_slice, get_entity_order, get_player_slice
+from code.utils.interning import add_player_codes
+
+PLAYER_MATCH_KEY_COLUMNS = ["game_id", "team", "player_id"]
+
+def build_player_match_matrix(lineups_df: pd.DataFrame, match_dimension: pd.DataFrame, season_index: dict) -> dict:
+    lineups_df = lineups_df[lineups_df["game_id"].isin(match_dimension["game_id"])]
+    row_codes, row_keys = pd.factorize(pd.MultiIndex.from_frame(lineups_df[PLAYER_MATCH_KEY_COLUMNS]))
+    stats = pd.Index(sorted(lineups_df["stat_name"].astype(object).unique()), dtype=object)
+    stat_codes = stats.get_indexer(lineups_df["stat_name"].astype(object))
+
+    # Column-major, so one stat across every player-game is a contiguous read.
+    values = np.full((len(row_keys), len(stats)), np.nan, dtype="float32", order="F")
+    values[row_codes, stat_codes] = lineups_df["stat_value"].to_numpy(dtype="float32")
+    present = np.zeros((len(row_keys), len(stats)), dtype=bool, order="F")
+    present[row_codes, stat_codes] = True
+
+    # drop_duplicates keeps first appearances, the same order factorize numbers rows in.
+    rows = lineups_df.drop(columns=["stat_name", "stat_value"]).drop_duplicates(subset=PLAYER_MATCH_KEY_COLUMNS)
+    rows = add_player_codes(attach_match_teams(rows.reset_index(drop=True), match_dimension), season_index)
+
+    # Rows are then regrouped by team, player and game so one team's player-games are contiguous.
+    order = get_entity_order(rows["team_code"], rows["player_code"], rows["game_id"])
+    rows = rows.take(order).reset_index(drop=True)
+
+    return add_entity_offsets(
+        {
+            "rows": rows,
+            "stats": stats,
+            "values": np.asfortranarray(values[order]),
+            "present": np.asfortranarray(present[order])
+        },
+        len(season_index["teams"])
+    )
+
+def get_stat_column(matrix: dict, stat_name: str) -> np.ndarray:
+    return matrix["values"][:, matrix["stats"].get_loc(stat_name)]
+
+def get_stat_rows(matrix: dict, stat_name: str, team_code: int = None, player_code: int = None) -> pd.DataFrame:
+    # Player-games that recorded the stat, shaped like the long table filtered on stat_name,
+    # optionally for one team's or one team player's contiguous block only.
+    if team_code is None:
+        rows = slice(None)
+    elif player_code is None:
+        rows = get_code_slice(matrix["team_offsets"], team_code)
+    else:
+        rows = get_player_slice(matrix, team_code, player_code)
+    if stat_name not in matrix["stats"]:
+        return matrix["rows"].iloc[:0].assign(stat_name=stat_name, stat_value=np.float32())
+    is_present = matrix["present"][rows, matrix["stats"].get_loc(stat_name)]
+    stat_rows = matrix["rows"].iloc[rows][is_present].reset_index(drop=True)
+    stat_rows["stat_name"] = stat_name
+    stat_rows["stat_value"] = get_stat_column(matrix, stat_name)[rows][is_present]
+    return stat_rows
@@ -0,0 +1,173 @@
+import pandas as pd
+
+SCHEMA_VERSION = 3
+
+# Integer columns with missing values widen to float64, which keeps ids and timestamps
+# exact; float32 rounds anything past 2**24.
+MISSING_INTEGER_DTYPE = "float64"
+
+MATCH_KEY_COLUMNS = {
+    "country": "category",
+    "tournament": "category",
+    "season": "category",
+    "week": "int16",
+    "game_id": "int32"
+}
+
+DATASET_SCHEMAS = {
+    "match_data": {
+        **MATCH_KEY_COLUMNS,
+        "home_team": "category",
+        "home_team_id": "int32",
+        "away_team": "category",
+        "away_team_id": "int32",
+        "injury_time_1": "float32",
+        "injury_time_2": "float32",
+        "start_timestamp": "int64",
+        "status": "category",
+        "home_score_current": "float32",
+        "home_score_display": "float32",
+        "home_score_period1": "float32",
+        "home_score_period2": "float32",
+        "home_score_normaltime": "float32",
+        "away_score_current": "float32",
+        "away_score_display": "float32",
+        "away_score_period1": "float32",
+        "away_score_period2": "float32",
+        "away_score_normaltime": "float32"
+    },
+    "shots_data": {
+        **MATCH_KEY_COLUMNS,
+        "player_name": "category",
+        "player_id": "int32",
+        "player_position": "category",
+        "is_home": "bool",
+        "incident_type": "category",
+        "shot_type": "category",
+        "body_part": "category",
+        "goal_type": "category",
+        "situation": "category",
+        "goal_mouth_location": "category",
+        "xg": "float32",
+        "xgot": "float32",
+        "player_coordinates_x": "float32",
+        "player_coordinates_y": "float32",
+        "player_coordinates_z": "float32",
+        "goal_mouth_coordinates_x": "float32",
+        "goal_mouth_coordinates_y": "float32",
+        "goal_mouth_coordinates_z": "float32",
+        "draw_start_x": "float32",
+        "draw_start_y": "float32",
+        "draw_end_x": "float32",
+        "draw_end_y": "float32",
+        "draw_goal_x": "float32",
+        "draw_goal_y": "float32",
+        "block_coordinates_x": "float32",
+        "block_coordinates_y": "float32",
+        "block_coordinates_z": "float32",
+        "time": "int16",
+        "time_seconds": "int32",
+        "added_time": "int16"
+    },
+    "coordinates_data": {
+        **MATCH_KEY_COLUMNS,
+        "team": "category",
+        "player_id": "int32",
+        "player_name": "category",
+        "x": "float32",
+        "y": "float32"
+    },
+    "lineups_data": {
+        **MATCH_KEY_COLUMNS,
+        "team": "category",
+        "player_name": "category",
+        "player_id": "int32",
+        "stat_name": "category",
+        "stat_value": "float32"
+    },
+    "match_stats_data": {
+        **MATCH_KEY_COLUMNS,
+        "period": "category",
+        "group_name": "category",
+        "stat_name": "category",
+        "home_value": "float64",
+        "home_success": "float64",
+        "home_total": "float64",
+        "home_ratio": "float64",
+        "away_value": "float64",
+        "away_success": "float64",
+        "away_total": "float64",
+        "away_ratio": "float64"
+    },
+    "goal_networks_data": {
+        **MATCH_KEY_COLUMNS,
+        "player_name": "category",
+        "player_id": "int32",
+        "event_type": "category",
+        "player_x": "float32",
+        "player_y": "float32",
+        "pass_end_x": "float32",
+        "pass_end_y": "float32",
+        "is_assist": "float32",
+        "goalkeeper_x": "float32",
+        "goalkeeper_y": "float32",
+        "goal_shot_x": "float32",
+        "goal_shot_y": "float32",
+        "goal_mouth_x": "float32",
+        "goal_mouth_y": "float32",
+        "goalkeeper_name": "category",
+        "goalkeeper_id": "float32"
+    },
+    "substitutions_data": {
+        **MATCH_KEY_COLUMNS,
+        "time": "int16",
+        "player_in": "category",
+        "player_in_id": "int32",
+        "player_out": "category",
+        "player_out_id": "int32"
+    },
+    "momentum_data": {
+        **MATCH_KEY_COLUMNS,
+        "minute": "float32",
+        "value": "int16"
+    },
+    "match_odds_data": {
+        **MATCH_KEY_COLUMNS,
+        "market_name": "category",
+        "market_id": "int16",
+        "choice_name": "category",
+        "change": "int8"
+    },
+    "standings_data": {
+        "country": "category",
+        "tournament": "category",
+        "team_name": "category",
+        "team_id": "int32",
+        "position": "int16",
+        "matches": "int16",
+        "wins": "int16",
+        "draws": "int16",
+        "losses": "int16",
+        "scores_for": "int16",
+        "scores_against": "int16",
+        "points": "int16",
+        "category": "category"
+    }
+}
+
+def apply_schema(df: pd.DataFrame, kind: str) -> pd.DataFrame:
+    schema = DATASET_SCHEMAS.get(kind)
+    if schema is None or df.empty:
+        return df
+
+    conversions = {}
+    for column, dtype in schema.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        if dtype in ("bool", "int8", "int16", "int32", "int64") and df[column].isna().any():
+            if dtype == "bool":
+                continue
+            dtype = MISSING_INTEGER_DTYPE
+        conversions[column] = dtype
+
+    return df.astype(conversions) if conversions else df
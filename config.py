@@ -264,4 +264,7 @@ game_stats_group_name_translations = {
 
 LEAGUE_COUNTRY_LOOKUP = {
     "super_lig": "turkey"
-}
\ No newline at end of file
+}
+
+# Dixon-Coles time decay (xi) per day between a match and the latest one; 0 weighs every match equally.
+dixon_coles_time_decays = [0.0, 0.002, 0.005, 0.01, 0.02]
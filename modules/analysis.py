@@ -1,15 +1,11 @@
 import os
 import streamlit as st
-from code.analysis import (
-    match_statistics_impact_analysis,
-    predictive_analytics
-)
-from code.utils.helpers import load_filtered_json_files, get_user_selection
-from config import match_performance_translations, match_performance_binary, LEAGUE_COUNTRY_LOOKUP
-
-def render_spinner(content_function, *args, **kwargs):
+from code.utils.helpers import load_filtered_json_files, load_analysis, get_user_selection
+from config import match_performance_translations, match_performance_binary, dixon_coles_time_decays, LEAGUE_COUNTRY_LOOKUP
+
+def render_spinner(analysis_name, *args, **kwargs):
     with st.spinner("İçerik hazırlanıyor..."):
-        content_function(*args, **kwargs)
+        load_analysis(analysis_name).main(*args, **kwargs)
 
 def load_game_data(directories, league_display, season_display):
     country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
@@ -54,7 +50,7 @@ def handle_eda_analysis(team_list, change_situations, change_body_parts, selecte
             return
 
         render_spinner(
-            match_statistics_impact_analysis.main,
+            "match_statistics_impact_analysis",
             league,
             season,
             league_display,
@@ -93,7 +89,7 @@ def handle_predictive_analytics(team_list, change_situations, change_body_parts,
     if selected_model == "Dixon-Coles":
         plot_type = st.sidebar.radio(
             label="Gösterim Şekli:",
-            options=["Matris", "Sıralı", "Özet", "Takım Gücü"],
+            options=["Matris", "Sıralı", "Özet", "Takım Gücü", "Hafta Tablosu"],
             index=None,
             label_visibility="hidden"
         )
@@ -113,12 +109,32 @@ def handle_predictive_analytics(team_list, change_situations, change_body_parts,
             )
         else:
             first_n_goals = 10
+
+        xi = st.sidebar.selectbox(
+            label="Zaman Ağırlığı:",
+            options=dixon_coles_time_decays,
+            index=0,
+            format_func=lambda xi: "Zaman Ağırlığı Yok" if xi == 0 else f"Zaman Ağırlığı (ξ = {xi:g})",
+            label_visibility="hidden",
+            key="dixon_coles_xi"
+        )
+        split_venues = False
     elif selected_model == "Bradley-Terry":
         plot_type = None
         first_n_goals = None
+        xi = 0.0
+
+        split_venues = st.sidebar.radio(
+            label="Reyting Türü:",
+            options=[False, True],
+            index=0,
+            format_func=lambda split_venues: "İç Saha / Deplasman" if split_venues else "Genel",
+            label_visibility="hidden",
+            key="bradley_terry_split_venues"
+        )
 
     render_spinner(
-        predictive_analytics.main,
+        "predictive_analytics",
         league,
         season,
         league_display,
@@ -127,7 +143,10 @@ def handle_predictive_analytics(team_list, change_situations, change_body_parts,
         selected_game,
         max_round_next_day,
         plot_type,
-        first_n_goals
+        first_n_goals,
+        xi,
+        games_list,
+        split_venues
     )
 
 def display_eda_analysis(team_list, change_situations, change_body_parts, league, season):
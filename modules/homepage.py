@@ -1,4 +1,6 @@
+import os
 import streamlit as st
+from config import LEAGUE_COUNTRY_LOOKUP
 
 def initialize_session_state():
     if "league_season_confirmed" not in st.session_state:
@@ -17,6 +19,30 @@ def render_welcome_message():
     """, unsafe_allow_html=True)
     st.divider()
 
+def start_data_prefetch(league, season):
+    # The data helpers import pandas, so they load on confirmation rather than with the home page.
+    from code.utils.helpers import get_league_display, get_season_display, start_prefetch
+
+    directories = os.path.join(os.path.dirname(__file__), '../data/sofascore/raw/')
+    league_display = get_league_display(league)
+    st.session_state["data_prefetch"] = start_prefetch(
+        directories,
+        LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown"),
+        league_display,
+        get_season_display(season)
+    )
+
+def render_prefetch_status():
+    status = st.session_state.get("data_prefetch")
+    if status is None:
+        return
+    if status["state"] == "running":
+        st.caption("Veriler arka planda hazırlanıyor...")
+    elif status["state"] == "ready":
+        st.caption("Veriler hazır.")
+    elif status["state"] == "failed":
+        st.warning(f"Veriler arka planda hazırlanamadı; analizler açıldığında yüklenecek. {status['error']}")
+
 def render_league_season_selection():
     st.markdown("<h3>Lig ve Sezon Seçimi</h3>", unsafe_allow_html=True)
     st.markdown("""
@@ -45,6 +71,10 @@ def render_league_season_selection():
         st.session_state["selected_season"] = selected_season
         st.session_state["league_season_confirmed"] = True
         st.success(f"{st.session_state['selected_league']} {st.session_state['selected_season']} sezonu seçiminiz kaydedildi.")
+        if selected_league and selected_season:
+            start_data_prefetch(selected_league, selected_season)
+
+    render_prefetch_status()
 
 def display_homepage():
     initialize_session_state()
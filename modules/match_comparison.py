@@ -1,7 +1,6 @@
 import os
 import streamlit as st
-from code.analysis.xg_racer import main as xg_racer_main
-from code.utils.helpers import load_filtered_json_files, get_user_selection
+from code.utils.helpers import load_analysis, load_match_dimension, get_user_selection
 from config import LEAGUE_COUNTRY_LOOKUP
 
 def render_spinner(content_function, *args, **kwargs):
@@ -35,8 +34,7 @@ def display_xg_analysis(team_list, change_situations, change_body_parts):
     if analysis_type == "xG Merdiveni":
         directories = os.path.join(os.path.dirname(__file__), "../data/sofascore/raw/")
         country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
-        match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-        match_data_df = match_data_df[match_data_df["status"].isin(["Ended","Retired"])]
+        match_data_df = load_match_dimension(directories, country_display, league_display, season_display)
         match_data_df = match_data_df[["week", "home_team", "away_team"]]
 
         rounds = match_data_df["week"].unique()
@@ -70,7 +68,7 @@ def display_xg_analysis(team_list, change_situations, change_body_parts):
             return
 
         home_team, away_team = selected_match.split(" - ")
-        xg_racer_main(
+        load_analysis("xg_racer").main(
             league,
             season,
             league_display,
@@ -1,59 +1,43 @@
 import os
 import streamlit as st
-from code.analysis import player_heatmap, player_shot_location, player_rating
-from code.utils.helpers import load_filtered_json_files, get_user_selection
+from code.utils.helpers import load_coordinate_store, load_entity_rows, load_match_dimension, load_player_match_matrix, load_season_index, read_season_artifact, load_analysis, get_user_selection
+from code.utils.coordinate_store import get_player_game_sides
+from code.utils.entity_index import get_team_rows
+from code.utils.interning import get_team_code
+from code.utils.player_match_matrix import get_stat_rows
+from code.utils.derived_tables import attach_match_teams, build_team_players
 from config import LEAGUE_COUNTRY_LOOKUP
 
-def render_spinner(content_function, *args, **kwargs):
+def render_spinner(analysis_name, *args, **kwargs):
     with st.spinner("İçerik hazırlanıyor..."):
-        content_function(*args, **kwargs)
+        load_analysis(analysis_name).main(*args, **kwargs)
 
 def load_team_data(team, data_type, directories, league_display, season_display):
     country_display = LEAGUE_COUNTRY_LOOKUP.get(league_display, "unknown")
-    match_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, "match_data")
-    specific_data_df = load_filtered_json_files(directories, country_display, league_display, season_display, data_type)
 
-    match_data_df = match_data_df[["game_id", "tournament", "season", "week", "home_team", "away_team"]]
+    team_players = read_season_artifact(directories, country_display, league_display, season_display, "team_players")
+    if team_players is not None:
+        return team_players.loc[(team_players["source"] == data_type) & (team_players["team_name"] == team), ["player_name"]]
 
+    season_index = load_season_index(directories, country_display, league_display, season_display)
+    team_code = get_team_code(season_index, team)
     if data_type == "coordinates_data":
-        merged_data = specific_data_df.merge(
-            match_data_df,
-            on=["game_id", "tournament", "season", "week"],
-            how="left"
-        )
-        merged_data["team_name"] = merged_data.apply(
-            lambda row: row["home_team"] if row["team"] == "home" else row["away_team"],
-            axis=1
+        merged_data = attach_match_teams(
+            get_player_game_sides(load_coordinate_store(directories, country_display, league_display, season_display)),
+            load_match_dimension(directories, country_display, league_display, season_display)
         )
+        team_data = merged_data[merged_data["team_code"] == team_code]
     elif data_type == "shots_data":
-        specific_data_df = specific_data_df[[
-            "tournament", "season", "week", "game_id", "player_name", "is_home", "shot_type", "goal_type",
-            "situation", "goal_mouth_location", "player_coordinates_x", "player_coordinates_y"
-        ]]
-        merged_data = specific_data_df.merge(
-            match_data_df,
-            on=["tournament", "season", "week", "game_id"],
-            how="left"
-        )
-        merged_data["team_name"] = merged_data.apply(
-            lambda row: row["home_team"] if row["is_home"] else row["away_team"],
-            axis=1
-        )
-        merged_data = merged_data[merged_data["goal_type"] != "own"]
+        team_data = get_team_rows(load_entity_rows(directories, country_display, league_display, season_display), team_code)
+        team_data = team_data[team_data["goal_type"] != "own"]
     elif data_type == "lineups_data":
-        merged_data = specific_data_df.merge(
-            match_data_df,
-            on=["tournament", "season", "week", "game_id"],
-            how="left"
-        )
-        merged_data["team_name"] = merged_data.apply(
-            lambda row: row["home_team"] if row["team"] == "home" else row["away_team"],
-            axis=1
+        team_data = get_stat_rows(
+            load_player_match_matrix(directories, country_display, league_display, season_display),
+            "rating",
+            team_code
         )
-        merged_data = merged_data[merged_data["stat_name"] == "rating"]
 
-    team_data = merged_data[merged_data["team_name"] == team]
-    return team_data[["player_name"]].drop_duplicates()
+    return build_team_players({data_type: team_data}, season_index)[["player_name"]]
 
 def handle_player_section(section, team_list, change_situations, change_body_parts):
     league, season, league_display, season_display, team, _, _ = get_user_selection(
@@ -92,11 +76,11 @@ def handle_player_section(section, team_list, change_situations, change_body_par
         st.warning("Lütfen bir oyuncu seçin.")
     else:
         if section == "Isı Haritası":
-            render_spinner(player_heatmap.main, league, season, league_display, season_display, team, selected_player)
+            render_spinner("player_heatmap", league, season, league_display, season_display, team, selected_player)
         elif section == "Şut Lokasyonu":
-            render_spinner(player_shot_location.main, league, season, league_display, season_display, team, selected_player)
+            render_spinner("player_shot_location", league, season, league_display, season_display, team, selected_player)
         elif section == "Reyting":
-            render_spinner(player_rating.main, league, season, league_display, season_display, team, selected_player)
+            render_spinner("player_rating", league, season, league_display, season_display, team, selected_player)
 
 def display_player_based(team_list, change_situations, change_body_parts, league, season):
     section = st.sidebar.selectbox(
@@ -1,13 +1,9 @@
 import streamlit as st
-from code.analysis import (
-    goal_path,
-    shot_location
-)
-from code.utils.helpers import get_user_selection
+from code.utils.helpers import load_analysis, get_user_selection
 
-def render_spinner(content_function, *args, **kwargs):
+def render_spinner(analysis_name, *args, **kwargs):
     with st.spinner("İçerik hazırlanıyor..."):
-        content_function(*args, **kwargs)
+        load_analysis(analysis_name).main(*args, **kwargs)
 
 def handle_goal_path(team_list, change_situations, change_body_parts):
     league, season, league_display, season_display, team, _, _ = get_user_selection(
@@ -45,7 +41,7 @@ def handle_goal_path(team_list, change_situations, change_body_parts):
         return
 
     render_spinner(
-        goal_path.main,
+        "goal_path",
         league,
         season,
         league_display,
@@ -70,7 +66,7 @@ def handle_shot_location(team_list, change_situations, change_body_parts):
         return
     else:
         render_spinner(
-            shot_location.main,
+            "shot_location",
             league,
             season,
             league_display,
@@ -1,22 +1,10 @@
 import streamlit as st
-from code.analysis import (
-    xg_time_series,
-    xg_actual_vs_expected,
-    xg_strengths_vs_weaknesses,
-    xg_defensive_efficiency,
-    performance,
-    team_rating,
-    team_similarity,
-    goal_creation_patterns,
-    team_win_rate,
-    geometry
-)
-from code.utils.helpers import get_user_selection
+from code.utils.helpers import load_analysis, get_user_selection
 from config import match_performances, game_stats_group_name
 
-def render_spinner(content_function, *args, **kwargs):
+def render_spinner(analysis_name, *args, **kwargs):
     with st.spinner("İçerik hazırlanıyor..."):
-        content_function(*args, **kwargs)
+        load_analysis(analysis_name).main(*args, **kwargs)
 
 def process_xg_analysis(league, season, league_display, season_display, team_list_by_season, change_situations, change_body_parts):
     analysis_type = st.sidebar.selectbox(
@@ -39,15 +27,15 @@ def process_xg_analysis(league, season, league_display, season_display, team_lis
         "Kümülatif xG ve Gol (Haftalık Seri)",
         "Kümülatif xG ve Gol Farkı (Haftalık Seri)",
     ]:
-        render_spinner(xg_time_series.main, league, season, league_display, season_display, plot_type=analysis_type)
+        render_spinner("xg_time_series", league, season, league_display, season_display, plot_type=analysis_type)
     elif analysis_type == "Gerçekleşen ile Beklenen Gol Farkı":
-        render_spinner(xg_actual_vs_expected.main, league, season, league_display, season_display)
+        render_spinner("xg_actual_vs_expected", league, season, league_display, season_display)
     elif analysis_type in [
         "Üretilen xG ve Yenen xG (xGA)",
         "Üretilen xG ve Yenen xG (xGA) (Gerçekleşen ile Fark)",
     ]:
         render_spinner(
-            xg_strengths_vs_weaknesses.main,
+            "xg_strengths_vs_weaknesses",
             league,
             season,
             league_display,
@@ -58,7 +46,7 @@ def process_xg_analysis(league, season, league_display, season_display, team_lis
             plot_type=analysis_type,
         )
     elif analysis_type == "xG Bazlı Savunma Verimliliği":
-        render_spinner(xg_defensive_efficiency.main, league, season, league_display, season_display)
+        render_spinner("xg_defensive_efficiency", league, season, league_display, season_display)
 
 def display_team_comparison(team_list_by_season, change_situations, change_body_parts, league, season):
     section = st.sidebar.selectbox(
@@ -108,7 +96,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
         if not subcategory:
             st.warning("Lütfen bir istatistik seçin.")
             return
-        render_spinner(performance.main, subcategory, league, season, league_display, season_display)
+        render_spinner("performance", subcategory, league, season, league_display, season_display)
     elif section == "Reyting":
         subcategory = st.sidebar.selectbox(
             label="Analiz Tipleri",
@@ -125,7 +113,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
         if not subcategory:
             st.warning("Lütfen bir analiz tipi seçin.")
             return
-        render_spinner(team_rating.main, subcategory, league, season, league_display, season_display)
+        render_spinner("team_rating", subcategory, league, season, league_display, season_display)
     elif section == "Benzerlik":
         similarity_algorithm = st.sidebar.selectbox(
             label="Benzerlik Algoritmaları",
@@ -169,7 +157,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
                 st.warning("Lütfen en az bir istatistik kategorisi seçin.")
             else:
                 render_spinner(
-                    team_similarity.main,
+                    "team_similarity",
                     league,
                     season,
                     league_display,
@@ -209,7 +197,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
             st.warning("Lütfen bir gol payı tipi seçin.")
             return
         render_spinner(
-            goal_creation_patterns.main,
+            "goal_creation_patterns",
             category,
             subcategory,
             league,
@@ -219,7 +207,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
         )
     elif section == "Kazanma Oranı":
         render_spinner(
-            team_win_rate.main,
+            "team_win_rate",
             league, season,
             league_display,
             season_display
@@ -241,7 +229,7 @@ def display_team_comparison(team_list_by_season, change_situations, change_body_
             st.warning("Lütfen bir analiz tipi seçin.")
             return
         render_spinner(
-            geometry.main,
+            "geometry",
             category,
             league,
             season,